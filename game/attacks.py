@@ -0,0 +1,152 @@
+"""
+Precomputed attack tables.
+
+Leaper attacks (knight, king, pawn) are plain 64-entry bitboard lists.
+Sliding attacks are looked up by the blocker squares on the piece's rays (PEXT-style):
+every subset of a square's relevant occupancy mask is enumerated once at import, so the
+attack set for any board is a single dict lookup keyed by `occupancy & mask`.
+"""
+from constants import FILE_A, FILE_H, ALL_SQUARES
+
+ROOK_DIRECTIONS = [(+1, 0), (-1, 0), (0, +1), (0, -1)]     # N, S, E, W
+BISHOP_DIRECTIONS = [(+1, +1), (+1, -1), (-1, +1), (-1, -1)] # NE, NW, SE, SW
+
+KNIGHT_DELTAS = [(-2, -1), (-2, +1), (-1, -2), (-1, +2), (+1, -2), (+1, +2), (+2, -1), (+2, +1)]
+KING_DELTAS = [(-1, -1), (-1, 0), (-1, +1), (0, -1), (0, +1), (+1, -1), (+1, 0), (+1, +1)]
+PAWN_DELTAS = [
+    [(+1, -1), (+1, +1)],  # White captures towards rank 8
+    [(-1, -1), (-1, +1)],  # Black captures towards rank 1
+]
+
+
+def _leaper_attacks(square: int, deltas: list[tuple[int, int]]) -> int:
+    attacks = 0
+    rank, file = divmod(square, 8)
+
+    for dr, df in deltas:
+        r, f = rank + dr, file + df
+        if 0 <= r < 8 and 0 <= f < 8:
+            attacks |= 1 << (r * 8 + f)
+
+    return attacks
+
+
+KNIGHT_ATTACKS = [_leaper_attacks(sq, KNIGHT_DELTAS) for sq in range(64)]
+KING_ATTACKS = [_leaper_attacks(sq, KING_DELTAS) for sq in range(64)]
+PAWN_ATTACKS = [[_leaper_attacks(sq, PAWN_DELTAS[color]) for sq in range(64)] for color in (0, 1)] # [color][square]
+
+
+def _ray_attacks(square: int, occupancy: int, directions: list[tuple[int, int]]) -> int:
+    # Reference ray walk, only used to fill the tables
+    attacks = 0
+    rank, file = divmod(square, 8)
+
+    for dr, df in directions:
+        r, f = rank + dr, file + df
+        while 0 <= r < 8 and 0 <= f < 8:
+            bit = 1 << (r * 8 + f)
+            attacks |= bit
+            if occupancy & bit:  # Blocked
+                break
+            r += dr
+            f += df
+
+    return attacks
+
+
+def _relevant_mask(square: int, directions: list[tuple[int, int]]) -> int:
+    # Squares whose occupancy can change the attack set (the last square of each ray never can)
+    mask = 0
+    rank, file = divmod(square, 8)
+
+    for dr, df in directions:
+        r, f = rank + dr, file + df
+        while 0 <= r + dr < 8 and 0 <= f + df < 8:
+            mask |= 1 << (r * 8 + f)
+            r += dr
+            f += df
+
+    return mask
+
+
+def _build_slider_table(directions: list[tuple[int, int]]) -> tuple[list[int], list[dict[int, int]]]:
+    masks = []
+    tables = []
+    for square in range(64):
+        mask = _relevant_mask(square, directions)
+        table = {}
+        subset = 0
+        while True:  # Carry-rippler walk over every subset of the mask
+            table[subset] = _ray_attacks(square, subset, directions)
+            subset = (subset - mask) & mask
+            if subset == 0:
+                break
+        masks.append(mask)
+        tables.append(table)
+    return masks, tables
+
+
+ROOK_MASKS, ROOK_TABLE = _build_slider_table(ROOK_DIRECTIONS)
+BISHOP_MASKS, BISHOP_TABLE = _build_slider_table(BISHOP_DIRECTIONS)
+
+
+def bishop_attacks(square: int, occupancy: int) -> int:
+    return BISHOP_TABLE[square][occupancy & BISHOP_MASKS[square]]
+
+def rook_attacks(square: int, occupancy: int) -> int:
+    return ROOK_TABLE[square][occupancy & ROOK_MASKS[square]]
+
+def queen_attacks(square: int, occupancy: int) -> int:
+    return BISHOP_TABLE[square][occupancy & BISHOP_MASKS[square]] | ROOK_TABLE[square][occupancy & ROOK_MASKS[square]]
+
+
+def attack_map(pieces: list[int], color: int, occupancy: int) -> int:
+    """
+    Every square attacked by one side, given its six piece bitboards (indexed by piece type) and the occupancy
+    the sliders should see. Leaving the defending king out of the occupancy shows the squares it cannot step to.
+    """
+    pawns_bb = pieces[0]
+    if color == 0:
+        attacks = (((pawns_bb & ~FILE_A) << 7) | ((pawns_bb & ~FILE_H) << 9)) & ALL_SQUARES
+    else:
+        attacks = ((pawns_bb & ~FILE_H) >> 7) | ((pawns_bb & ~FILE_A) >> 9)
+
+    knights_bb = pieces[1]
+    while knights_bb:
+        square = (knights_bb & -knights_bb).bit_length() - 1
+        knights_bb &= knights_bb - 1
+        attacks |= KNIGHT_ATTACKS[square]
+
+    diagonal_bb = pieces[2] | pieces[4]
+    while diagonal_bb:
+        square = (diagonal_bb & -diagonal_bb).bit_length() - 1
+        diagonal_bb &= diagonal_bb - 1
+        attacks |= BISHOP_TABLE[square][occupancy & BISHOP_MASKS[square]]
+
+    straight_bb = pieces[3] | pieces[4]
+    while straight_bb:
+        square = (straight_bb & -straight_bb).bit_length() - 1
+        straight_bb &= straight_bb - 1
+        attacks |= ROOK_TABLE[square][occupancy & ROOK_MASKS[square]]
+
+    if pieces[5]:
+        attacks |= KING_ATTACKS[pieces[5].bit_length() - 1]
+    return attacks
+
+
+def _build_line_tables() -> tuple[list[list[int]], list[list[int]]]:
+    between = [[0] * 64 for _ in range(64)]
+    line = [[0] * 64 for _ in range(64)]
+    for a in range(64):
+        for directions in (ROOK_DIRECTIONS, BISHOP_DIRECTIONS):
+            rays = _ray_attacks(a, 0, directions)
+            for b in range(64):
+                if rays & (1 << b):
+                    between[a][b] = _ray_attacks(a, 1 << b, directions) & _ray_attacks(b, 1 << a, directions)
+                    line[a][b] = (rays & _ray_attacks(b, 0, directions)) | (1 << a) | (1 << b)
+    return between, line
+
+
+# [a][b], zero when a and b share no rank, file or diagonal:
+# BETWEEN holds the squares strictly between them, LINE the whole edge-to-edge line through both
+BETWEEN, LINE = _build_line_tables()
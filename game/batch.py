@@ -0,0 +1,188 @@
+"""
+Struct-of-arrays storage for many positions at once, with NumPy kernels that work on every position in one call.
+
+BoardBatch.boards is a (N, 2, 6) uint64 array indexed like State.boards: [position, color, piece type].
+The kernels are set-wise shifts on whole bitboards (the same tricks as attack_map's pawn step), so no
+Python code runs per position or per square. Sliders use Kogge-Stone fills instead of the lookup tables.
+
+    batch = BoardBatch.from_states(states)
+    checked = batch.in_check()        # (N,) bool
+"""
+import numpy as np
+
+from bitboard import State
+from constants import WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, NO_SQUARE, FILE_A, FILE_H, RANK_3, RANK_6
+
+NOT_FILE_A = np.uint64(~FILE_A & 0xFFFFFFFFFFFFFFFF)
+NOT_FILE_H = np.uint64(~FILE_H & 0xFFFFFFFFFFFFFFFF)
+NOT_FILE_AB = np.uint64(~(FILE_A | FILE_A << 1) & 0xFFFFFFFFFFFFFFFF)
+NOT_FILE_GH = np.uint64(~(FILE_H | FILE_H >> 1) & 0xFFFFFFFFFFFFFFFF)
+ALL_SQUARES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# (shift, mask): positive shifts go left (towards H8), the mask drops squares that wrapped around a file edge
+ROOK_SHIFTS = [(8, ALL_SQUARES), (-8, ALL_SQUARES), (1, NOT_FILE_A), (-1, NOT_FILE_H)]
+BISHOP_SHIFTS = [(9, NOT_FILE_A), (7, NOT_FILE_H), (-7, NOT_FILE_A), (-9, NOT_FILE_H)]
+
+
+def _shift(bb: np.ndarray, amount: int) -> np.ndarray:
+    # uint64 left shifts wrap modulo 2**64, so bits pushed past H8 simply fall off
+    return bb << np.uint64(amount) if amount > 0 else bb >> np.uint64(-amount)
+
+
+def knight_attacks(knights: np.ndarray) -> np.ndarray:
+    west1 = (knights >> np.uint64(1)) & NOT_FILE_H
+    west2 = (knights >> np.uint64(2)) & NOT_FILE_GH
+    east1 = (knights << np.uint64(1)) & NOT_FILE_A
+    east2 = (knights << np.uint64(2)) & NOT_FILE_AB
+    one_file = west1 | east1
+    two_files = west2 | east2
+    return (one_file << np.uint64(16)) | (one_file >> np.uint64(16)) | (two_files << np.uint64(8)) | (two_files >> np.uint64(8))
+
+
+def king_attacks(kings: np.ndarray) -> np.ndarray:
+    sideways = ((kings << np.uint64(1)) & NOT_FILE_A) | ((kings >> np.uint64(1)) & NOT_FILE_H)
+    row = kings | sideways
+    return sideways | (row << np.uint64(8)) | (row >> np.uint64(8))
+
+
+def pawn_attacks(pawns: np.ndarray, color: int) -> np.ndarray:
+    if color == WHITE:
+        return ((pawns << np.uint64(7)) & NOT_FILE_H) | ((pawns << np.uint64(9)) & NOT_FILE_A)
+    return ((pawns >> np.uint64(7)) & NOT_FILE_A) | ((pawns >> np.uint64(9)) & NOT_FILE_H)
+
+
+def pawn_pushes(pawns: np.ndarray, empty: np.ndarray, color: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Destination squares of the single and double pawn pushes for one color.
+    """
+    if color == WHITE:
+        single = (pawns << np.uint64(8)) & empty
+        double = ((single & np.uint64(RANK_3)) << np.uint64(8)) & empty
+    else:
+        single = (pawns >> np.uint64(8)) & empty
+        double = ((single & np.uint64(RANK_6)) >> np.uint64(8)) & empty
+    return single, double
+
+
+def slider_attacks(sliders: np.ndarray, empty: np.ndarray, shifts: list[tuple[int, np.uint64]]) -> np.ndarray:
+    """
+    Union of the attacks of every slider along the given directions, via Kogge-Stone occluded fills.
+    """
+    attacks = np.zeros_like(sliders)
+    for shift, mask in shifts:
+        generator = sliders
+        propagator = empty & mask
+        for step in (shift, 2 * shift, 4 * shift):
+            generator = generator | (propagator & _shift(generator, step))
+            propagator = propagator & _shift(propagator, step)
+        attacks |= _shift(generator, shift) & mask
+    return attacks
+
+
+class BoardBatch:
+    """
+    N positions as arrays: boards (N, 2, 6) uint64, to_move, castling and en_passant (NO_SQUARE when none) uint8,
+    fifty_move uint16. Same bit layouts as State.
+    """
+    __slots__ = ('boards', 'to_move', 'castling', 'en_passant', 'fifty_move')
+
+    def __init__(self, size: int):
+        self.boards = np.zeros((size, 2, 6), dtype=np.uint64)
+        self.to_move = np.zeros(size, dtype=np.uint8)
+        self.castling = np.zeros(size, dtype=np.uint8)
+        self.en_passant = np.full(size, NO_SQUARE, dtype=np.uint8)
+        self.fifty_move = np.zeros(size, dtype=np.uint16)
+
+    def __len__(self) -> int:
+        return len(self.boards)
+
+    @classmethod
+    def from_states(cls, states: list[State]) -> 'BoardBatch':
+        batch = cls(len(states))
+        batch.boards[:] = [state.boards for state in states]
+        batch.to_move[:] = [state.toMove for state in states]
+        batch.castling[:] = [state.castling for state in states]
+        batch.en_passant[:] = [state.en_passant for state in states]
+        batch.fifty_move[:] = [state.fifty_move for state in states]
+        return batch
+
+    def to_state(self, index: int) -> State:
+        state = State()
+        state.boards = [[int(bb) for bb in color_boards] for color_boards in self.boards[index]]
+        state.toMove = int(self.to_move[index])
+        state.castling = int(self.castling[index])
+        state.en_passant = int(self.en_passant[index])
+        state.fifty_move = int(self.fifty_move[index])
+        state.refresh_occupancy()
+        state.refresh_mailbox()
+        state.key = state.compute_key()
+        return state
+
+    def to_states(self) -> list[State]:
+        return [self.to_state(index) for index in range(len(self))]
+
+    def occupancy(self) -> np.ndarray:
+        """
+        (N, 2) union of each color's six boards.
+        """
+        return np.bitwise_or.reduce(self.boards, axis=2)
+
+    def occupied(self) -> np.ndarray:
+        occupancy = self.occupancy()
+        return occupancy[:, WHITE] | occupancy[:, BLACK]
+
+    def attack_maps(self) -> np.ndarray:
+        """
+        (N, 2) squares attacked by each color, what State.attacked_by gives for one position.
+        """
+        empty = ~self.occupied()
+        maps = np.empty((len(self), 2), dtype=np.uint64)
+        for color in (WHITE, BLACK):
+            pieces = self.boards[:, color]
+            maps[:, color] = (
+                pawn_attacks(pieces[:, PAWN], color)
+                | knight_attacks(pieces[:, KNIGHT])
+                | slider_attacks(pieces[:, BISHOP] | pieces[:, QUEEN], empty, BISHOP_SHIFTS)
+                | slider_attacks(pieces[:, ROOK] | pieces[:, QUEEN], empty, ROOK_SHIFTS)
+                | king_attacks(pieces[:, KING])
+            )
+        return maps
+
+    def in_check(self) -> np.ndarray:
+        """
+        (N,) whether the side to move's king is attacked.
+        """
+        rows = np.arange(len(self))
+        side = self.to_move.astype(np.intp)
+        kings = self.boards[rows, side, KING]
+        return (kings & self.attack_maps()[rows, 1 - side]) != 0
+
+    def pawn_pushes(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (N,) single and double push destinations of the side to move's pawns.
+        """
+        empty = ~self.occupied()
+        white_single, white_double = pawn_pushes(self.boards[:, WHITE, PAWN], empty, WHITE)
+        black_single, black_double = pawn_pushes(self.boards[:, BLACK, PAWN], empty, BLACK)
+        white_to_move = self.to_move == WHITE
+        return np.where(white_to_move, white_single, black_single), np.where(white_to_move, white_double, black_double)
+
+
+if __name__ == '__main__':
+    import time
+
+    fens = [
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        "7k/6Q1/8/8/8/8/8/K7 b - - 0 1",
+    ]
+    batch = BoardBatch.from_states([State.from_fen(fen) for fen in fens])
+    print("in check:", batch.in_check())
+
+    big = BoardBatch(1_000_000)
+    big.boards[:] = batch.boards[np.arange(len(big)) % len(fens)]
+    big.to_move[:] = batch.to_move[np.arange(len(big)) % len(fens)]
+    start = time.perf_counter()
+    checked = big.in_check()
+    print(f"{len(big)} positions in {time.perf_counter() - start:.3f}s, {int(checked.sum())} in check")
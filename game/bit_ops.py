@@ -17,7 +17,7 @@ def lsb_index(bitboard: int) -> int:
     return (bitboard & -bitboard).bit_length() - 1 # Faster way using 2's complement properties
 
 def popcount(bb: int) -> int:
-    return bin(bb).count('1')
+    return bb.bit_count()
 
 
 def msb_index(bitboard: int) -> int:
@@ -29,9 +29,6 @@ def msb_index(bitboard: int) -> int:
 def bitScanForward(bb: int) -> int:
     return (bb & -bb).bit_length() - 1
 
-def bitboard_to_squares(bb: int):
-    return [Square(i) for i in range(64) if (bb >> i) & 1]
-
 def bitscan(bb: int) -> list[int]:
     """Returns a list of indices of bits set to 1 in the bitboard."""
     indices = []
@@ -45,12 +42,6 @@ def bitscan(bb: int) -> list[int]:
 def bitboard_to_squares(bb: int) -> list[Square]:
     """
     Returns a list of Square enum members for all set bits in the bitboard.
-    Efficiently iterates by repeatedly finding and clearing the LSB.
+    Meant for printing and the public API; internal code should iterate bitscan() on plain ints.
     """
-    squares = []
-    temp_bb = bb
-    while temp_bb:
-        sq_idx = lsb_index(temp_bb)  # Find the index of the least significant set bit
-        squares.append(Square(sq_idx)) # Convert to Square enum and add to list
-        temp_bb = clear_bit(temp_bb, sq_idx) # Clear that bit to find the next LSB
-    return squares
\ No newline at end of file
+    return [Square(sq_idx) for sq_idx in bitscan(bb)]
@@ -1,9 +1,30 @@
-from constants import PieceType, PIECE_SYMBOLS, Color
+from constants import PieceType, PIECE_SYMBOLS, SQUARE_NAMES, Color, WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, NO_SQUARE
 from bit_ops import *
-from constants import Square
-from move import Move
+from constants import Square, A1, C1, D1, E1, F1, G1, H1, A8, C8, D8, E8, F8, G8, H8
+from move import encode_move, SQUARE_MASK, TO_SHIFT, PIECE_SHIFT, PROMOTION_SHIFT, COLOR_SHIFT, CAPTURE_FLAG, CASTLE_FLAG, EN_PASSANT_FLAG
 import time
 from edge_cases import PROMOTION
+from zobrist import ZOBRIST_PIECES, ZOBRIST_SIDE, ZOBRIST_CASTLING, ZOBRIST_EP_FILE
+from attacks import attack_map, PAWN_ATTACKS
+
+PIECES = [[(color, pt) for pt in range(6)] for color in range(2)] # Shared mailbox entries, indexed [color][piece]
+
+# Rights kept when a move starts or ends on each square: touching a king or rook home square drops its rights
+CASTLING_RIGHTS_MASK = [0b1111] * 64
+CASTLING_RIGHTS_MASK[E1] = 0b1100
+CASTLING_RIGHTS_MASK[H1] = 0b1110
+CASTLING_RIGHTS_MASK[A1] = 0b1101
+CASTLING_RIGHTS_MASK[E8] = 0b0011
+CASTLING_RIGHTS_MASK[H8] = 0b1011
+CASTLING_RIGHTS_MASK[A8] = 0b0111
+
+# Castling king destination -> (rook from, rook to)
+CASTLING_ROOK_SQUARES = {
+    G1: (H1, F1),
+    C1: (A1, D1),
+    G8: (H8, F8),
+    C8: (A8, D8),
+}
 
 class State:
     def __init__(self):
@@ -12,30 +33,99 @@ class State:
         """
         self.toMove = 0 # 0: White, 1: Black
         self.boards: list[list[int]] = [[0] * 6, [0] * 6]
+        self.occupancy: list[int] = [0, 0] # Per-color union of the six boards, kept in sync by every make/unmake
+        self.occupied: int = 0
+        self.mailbox: list[tuple[int, int] | None] = [None] * 64 # (color, piece) on each square
+        self.attack_maps: list[int | None] = [None, None] # Squares attacked by each color, filled on first use
         self.reset()
 
         self.moves: list[tuple] = []
 
         self.castling: int = 0b1111 # Each of the last 4 bits represent if the side is capable of castling to either side
 
-        self.en_passant: Square = Square.NO_SQUARE # Pawns may only capture to one square in the case of en passant
+        self.en_passant: int = NO_SQUARE # Pawns may only capture to one square in the case of en passant
 
         self.fifty_move = 0
 
+        self.key: int = self.compute_key() # Zobrist key, updated incrementally by make and restored by unmake
 
     def reset(self):
-        self.boards[0][PieceType.PAWN] = 0x000000000000FF00
-        self.boards[1][PieceType.PAWN] = 0x00FF000000000000
-        self.boards[0][PieceType.KNIGHT] = 0x0000000000000042
-        self.boards[1][PieceType.KNIGHT] = 0x4200000000000000
-        self.boards[0][PieceType.BISHOP] = 0x0000000000000024
-        self.boards[1][PieceType.BISHOP] = 0x2400000000000000
-        self.boards[0][PieceType.ROOK]   = 0x0000000000000081
-        self.boards[1][PieceType.ROOK]   = 0x8100000000000000
-        self.boards[0][PieceType.QUEEN]  = 0x0000000000000008
-        self.boards[1][PieceType.QUEEN]  = 0x0800000000000000
-        self.boards[0][PieceType.KING]   = 0x0000000000000010
-        self.boards[1][PieceType.KING]   = 0x1000000000000000
+        self.boards[0][PAWN] = 0x000000000000FF00
+        self.boards[1][PAWN] = 0x00FF000000000000
+        self.boards[0][KNIGHT] = 0x0000000000000042
+        self.boards[1][KNIGHT] = 0x4200000000000000
+        self.boards[0][BISHOP] = 0x0000000000000024
+        self.boards[1][BISHOP] = 0x2400000000000000
+        self.boards[0][ROOK]   = 0x0000000000000081
+        self.boards[1][ROOK]   = 0x8100000000000000
+        self.boards[0][QUEEN]  = 0x0000000000000008
+        self.boards[1][QUEEN]  = 0x0800000000000000
+        self.boards[0][KING]   = 0x0000000000000010
+        self.boards[1][KING]   = 0x1000000000000000
+        self.refresh_occupancy()
+        self.refresh_mailbox()
+
+    def refresh_occupancy(self):
+        """
+        Rebuilds the cached occupancy from scratch, needed only after editing self.boards directly
+        """
+        for color in (0, 1):
+            occupied_bb = 0
+            for pt in PieceType:
+                occupied_bb |= self.boards[color][pt]
+            self.occupancy[color] = occupied_bb
+        self.occupied = self.occupancy[0] | self.occupancy[1]
+        self.attack_maps = [None, None]
+
+    @classmethod
+    def from_fen(cls, fen: str) -> 'State':
+        """
+        Builds a position from Forsyth-Edwards Notation (halfmove/fullmove fields optional)
+        """
+        fields = fen.split()
+        state = cls()
+        state.boards = [[0] * 6, [0] * 6]
+
+        rank, file = 7, 0
+        for char in fields[0]:
+            if char == '/':
+                rank -= 1
+                file = 0
+            elif char.isdigit():
+                file += int(char)
+            else:
+                color = WHITE if char.isupper() else BLACK
+                state.boards[color][PIECE_SYMBOLS[color].index(char)] |= 1 << (rank * 8 + file)
+                file += 1
+
+        state.toMove = 0 if fields[1] == 'w' else 1
+        state.castling = 0
+        for char, right in (('K', 0b0001), ('Q', 0b0010), ('k', 0b0100), ('q', 0b1000)):
+            if char in fields[2]:
+                state.castling |= right
+        state.en_passant = NO_SQUARE if fields[3] == '-' else SQUARE_NAMES.index(fields[3])
+        # Dropped like in make() unless a pawn can take it, so the key matches the same position reached by moves
+        if state.en_passant != NO_SQUARE and not PAWN_ATTACKS[state.toMove ^ 1][state.en_passant] & state.boards[state.toMove][PAWN]:
+            state.en_passant = NO_SQUARE
+        state.fifty_move = int(fields[4]) if len(fields) > 4 else 0
+
+        state.refresh_occupancy()
+        state.refresh_mailbox()
+        state.key = state.compute_key()
+        return state
+
+    def refresh_mailbox(self):
+        """
+        Rebuilds the square -> (color, piece) array from the boards
+        """
+        self.mailbox = [None] * 64
+        for color in (0, 1):
+            for pt in PieceType:
+                bb = self.boards[color][pt]
+                while bb:
+                    sq = lsb_index(bb)
+                    self.mailbox[sq] = PIECES[color][pt]
+                    bb &= bb - 1
     
     def __str__(self):
         return self.printBoard()
@@ -52,10 +142,25 @@ class State:
         )
 
     def __hash__(self):
-        boards_tuple = tuple(
-            self.boards[color][piece] for color in (0, 1) for piece in range(6)
-        )
-        return hash((self.toMove, boards_tuple, self.castling, self.en_passant))
+        return self.key
+
+    def compute_key(self) -> int:
+        """
+        Zobrist key of the position from scratch: pieces, side to move, castling rights and en passant file
+        """
+        key = 0
+        for color in (0, 1):
+            for pt in PieceType:
+                bb = self.boards[color][pt]
+                while bb:
+                    key ^= ZOBRIST_PIECES[color][pt][lsb_index(bb)]
+                    bb &= bb - 1
+        if self.toMove == BLACK:
+            key ^= ZOBRIST_SIDE
+        key ^= ZOBRIST_CASTLING[self.castling]
+        if self.en_passant != NO_SQUARE:
+            key ^= ZOBRIST_EP_FILE[self.en_passant % 8]
+        return key
 
 
     def printBoard(self):
@@ -90,203 +195,162 @@ class State:
         print("  +------------------------+")
         print("    a b c d e f g h")
 
-    def get_all_occupied_squares(self) -> int:
-        occupied = 0
-        for pt in PieceType:
-            occupied |= self.boards[Color.WHITE][pt]
-            occupied |= self.boards[Color.BLACK][pt]
+    def attacked_by(self, color: int) -> int:
+        """
+        Every square attacked by color in this position. Computed once per position: make starts
+        the child with an empty cache and unmake hands the parent's cache back.
+        """
+        attacks = self.attack_maps[color]
+        if attacks is None:
+            attacks = self.attack_maps[color] = attack_map(self.boards[color], color, self.occupied)
+        return attacks
 
-        return occupied
+    def get_all_occupied_squares(self) -> int:
+        return self.occupied
     
     def get_occupied_by_color(self, color: Color) -> int:
-        occupied_bb = 0
-        for pt in PieceType:
-            occupied_bb |= self.boards[color][pt]
-        return occupied_bb
+        return self.occupancy[color]
     
     def piece_on_square(self, square: Square) -> PieceType | None:
-        mask = 1 << square
-        for pt in PieceType:
-            if (self.boards[0][pt] | self.boards[1][pt]) & mask:
-                return pt
-        return None
+        entry = self.mailbox[square]
+        return entry[1] if entry else None
     
     def piece_on_square_by_color(self, square: Square, color: Color) -> PieceType | None:
-        mask = 1 << square
-        for pt in PieceType:
-            if (self.boards[color][pt]) & mask:
-                return pt
+        entry = self.mailbox[square]
+        if entry and entry[0] == color:
+            return entry[1]
         return None
 
     
     def color_on_square(self, sq: Square) -> Color | None:
-        mask = 1 << sq
-        for color in range(2):
-            combined_bb = self.boards[color][PieceType.PAWN] | self.boards[color][PieceType.KNIGHT] | self.boards[color][PieceType.BISHOP] | self.boards[color][PieceType.ROOK] | self.boards[color][PieceType.QUEEN] | self.boards[color][PieceType.KING]
-            if mask & combined_bb:
-                return color
-        return None
-    
-    def move_piece(self, move: Move):
-        old_castling = self.castling
-        old_en_passant = self.en_passant
-        old_fifty = self.fifty_move
-        self.moves.append((move, None, old_castling, old_en_passant, old_fifty))
-
-        self.boards[self.toMove][move.piece_type] = set_bit(clear_bit(self.boards[self.toMove][move.piece_type], move.from_sq), move.to_sq)  
+        entry = self.mailbox[sq]
+        return entry[0] if entry else None
     
-    def capture(self, move: Move) -> None:
-        old_castling = self.castling
-        old_en_passant = self.en_passant
-        old_fifty = self.fifty_move
-        captured_piece = None
-        if move.is_en_passant:
-            captured_sq = move.to_sq - 8 if move.color == Color.WHITE else move.to_sq + 8
-            captured_piece = self.piece_on_square(captured_sq)
-        else:
-            captured_piece = self.piece_on_square(move.to_sq)
-
-        self.moves.append((move, captured_piece, old_castling, old_en_passant, old_fifty))
-
-        curr_player = self.toMove 
-
-        self.boards[curr_player ^ 1][captured_piece] = clear_bit(self.boards[curr_player ^ 1][captured_piece], move.to_sq)
-
-        self.boards[curr_player][move.piece_type] = set_bit(
-            clear_bit(self.boards[curr_player][move.piece_type], move.from_sq), move.to_sq
-        )
+    def make(self, move: int) -> tuple:
+        """
+        Plays a legal packed move: pieces, occupancy, mailbox, castling rights, en passant square,
+        fifty move counter, side to move and Zobrist key. Returns the undo record it pushed;
+        unmake() pops and applies it.
+        """
+        color = self.toMove
+        them = color ^ 1
+        from_sq = move & SQUARE_MASK
+        to_sq = (move >> TO_SHIFT) & SQUARE_MASK
+        piece_type = (move >> PIECE_SHIFT) & 7
+        promotion = (move >> PROMOTION_SHIFT) & 7
+        from_bb = 1 << from_sq
+        to_bb = 1 << to_sq
+        boards = self.boards[color]
+        key = self.key
 
-    
-    def castle(self, move: Move) -> None:
-        old_castling = self.castling
-        old_en_passant = self.en_passant
-        old_fifty = self.fifty_move
         captured_piece = None
-
-        self.moves.append((move, captured_piece, old_castling, old_en_passant, old_fifty))
-
-        color = self.toMove
-        k_b = self.boards[color][PieceType.KING]
-        r_b = self.boards[color][PieceType.ROOK]
-        to_sq = move.to_sq
-
-        if color == Color.WHITE:
-            if to_sq == Square.G1:  # Kingside
-                k_b = set_bit(clear_bit(k_b, Square.E1), Square.G1)
-                r_b = set_bit(clear_bit(r_b, Square.H1), Square.F1)
-                self.castling &= ~0b0001  # Clear White kingside
-            elif to_sq == Square.C1:  # Queenside
-                k_b = set_bit(clear_bit(k_b, Square.E1), Square.C1)
-                r_b = set_bit(clear_bit(r_b, Square.A1), Square.D1)
-                self.castling &= ~0b0010  # Clear White queenside
+        if move & EN_PASSANT_FLAG:
+            captured_sq = to_sq - 8 if color == WHITE else to_sq + 8
+            captured_piece = PAWN
+            self.boards[them][PAWN] ^= 1 << captured_sq
+            self.occupancy[them] ^= 1 << captured_sq
+            self.mailbox[captured_sq] = None
+            key ^= ZOBRIST_PIECES[them][PAWN][captured_sq]
+        elif move & CAPTURE_FLAG:
+            captured_piece = self.mailbox[to_sq][1]
+            self.boards[them][captured_piece] ^= to_bb
+            self.occupancy[them] ^= to_bb
+            key ^= ZOBRIST_PIECES[them][captured_piece][to_sq]
+
+        record = (move, captured_piece, self.castling, self.en_passant, self.fifty_move, self.key, self.attack_maps)
+        self.moves.append(record)
+
+        placed = promotion if promotion != PAWN else piece_type
+        boards[piece_type] ^= from_bb
+        boards[placed] |= to_bb
+        self.occupancy[color] ^= from_bb | to_bb
+        self.mailbox[from_sq] = None
+        self.mailbox[to_sq] = PIECES[color][placed]
+        key ^= ZOBRIST_PIECES[color][piece_type][from_sq] ^ ZOBRIST_PIECES[color][placed][to_sq]
+
+        if move & CASTLE_FLAG:
+            rook_from, rook_to = CASTLING_ROOK_SQUARES[to_sq]
+            boards[ROOK] ^= (1 << rook_from) | (1 << rook_to)
+            self.occupancy[color] ^= (1 << rook_from) | (1 << rook_to)
+            self.mailbox[rook_to] = self.mailbox[rook_from]
+            self.mailbox[rook_from] = None
+            key ^= ZOBRIST_PIECES[color][ROOK][rook_from] ^ ZOBRIST_PIECES[color][ROOK][rook_to]
+
+        if self.en_passant != NO_SQUARE:
+            key ^= ZOBRIST_EP_FILE[self.en_passant % 8]
+        self.en_passant = NO_SQUARE
+        if piece_type == PAWN and (to_sq - from_sq) in (16, -16):
+            ep_sq = (from_sq + to_sq) >> 1
+            # Only recorded when an enemy pawn can take it, so transpositions keep the same key
+            if PAWN_ATTACKS[color][ep_sq] & self.boards[them][PAWN]:
+                self.en_passant = ep_sq
+                key ^= ZOBRIST_EP_FILE[ep_sq % 8]
+
+        castling = self.castling & CASTLING_RIGHTS_MASK[from_sq] & CASTLING_RIGHTS_MASK[to_sq]
+        key ^= ZOBRIST_CASTLING[self.castling] ^ ZOBRIST_CASTLING[castling]
+        self.castling = castling
+
+        if piece_type == PAWN or captured_piece is not None:
+            self.fifty_move = 0
         else:
-            if to_sq == Square.G8:  # Kingside
-                k_b = set_bit(clear_bit(k_b, Square.E8), Square.G8)
-                r_b = set_bit(clear_bit(r_b, Square.H8), Square.F8)
-                self.castling &= ~0b0100  # Clear Black kingside
-            elif to_sq == Square.C8:  # Queenside
-                k_b = set_bit(clear_bit(k_b, Square.E8), Square.C8)
-                r_b = set_bit(clear_bit(r_b, Square.A8), Square.D8)
-                self.castling &= ~0b1000  # Clear Black queenside
-
-        self.boards[color][PieceType.KING] = k_b
-        self.boards[color][PieceType.ROOK] = r_b
-
-    def promote(self, move: Move):
-        old_castling = self.castling
-        old_en_passant = self.en_passant
-        old_fifty = self.fifty_move
-        captured_piece = None
-        if move.is_capture:
-            captured_piece = self.piece_on_square(move.to_sq)
-
-        self.moves.append((move, captured_piece, old_castling, old_en_passant, old_fifty))
+            self.fifty_move += 1
 
-        piece_on_square: PieceType | None = self.piece_on_square_by_color(move.to_sq, move.color)
+        self.occupied = self.occupancy[0] | self.occupancy[1]
+        self.attack_maps = [None, None]
+        self.toMove = them
+        self.key = key ^ ZOBRIST_SIDE
+        return record
 
-        if piece_on_square:
-            clear_bit(self.boards[self.toMove ^ 1][piece_on_square], move.to_sq)
-
-        self.boards[self.toMove][PieceType.PAWN] = clear_bit(self.boards[self.toMove][PieceType.PAWN], move.from_sq)
-        self.boards[self.toMove][move.promotion_type] = set_bit(self.boards[self.toMove][move.promotion_type], move.to_sq)
-
-    def en_passant(self, move: Move):
-        old_castling = self.castling
-        old_en_passant = self.en_passant
-        old_fifty = self.fifty_move
-        captured_piece = self.piece_on_square(move.to_sq)
-        captured_sq = move.to_sq - 8 if self.toMove == Color.WHITE else move.to_sq + 8
-
-    
-        self.moves.append((move, captured_piece, old_castling, old_en_passant, old_fifty))
-
-
-        self.boards[self.toMove][PieceType.PAWN] = set_bit(clear_bit(self.boards[self.toMove][PieceType.PAWN], move.from_sq), move.to_sq)
-
-        self.boards[self.toMove ^ 1][PieceType.PAWN] = clear_bit(self.boards[self.toMove ^ 1][PieceType.PAWN], captured_sq)
-
-        self.en_passant = Square.NO_SQUARE
-
-    def unmake_move(self):
+    def unmake(self):
         if not self.moves:
             return
 
-        move, captured_piece, old_castling, old_en_passant, old_fifty = self.moves.pop()
-
-        self.toMove = move.color
-        self.castling = old_castling
-        self.en_passant = old_en_passant
-        self.fifty_move = old_fifty
-
-        color = move.color
-        opp_color = color ^ 1
-        from_sq = move.from_sq
-        to_sq = move.to_sq
-
-        if move.is_castle:
-            # Reverse castling move
-            if color == Color.WHITE:
-                if to_sq == Square.G1:  # Kingside
-                    self.boards[color][PieceType.KING] = set_bit(clear_bit(self.boards[color][PieceType.KING], Square.G1), Square.E1)
-                    self.boards[color][PieceType.ROOK] = set_bit(clear_bit(self.boards[color][PieceType.ROOK], Square.F1), Square.H1)
-                elif to_sq == Square.C1:  # Queenside
-                    self.boards[color][PieceType.KING] = set_bit(clear_bit(self.boards[color][PieceType.KING], Square.C1), Square.E1)
-                    self.boards[color][PieceType.ROOK] = set_bit(clear_bit(self.boards[color][PieceType.ROOK], Square.D1), Square.A1)
+        move, captured_piece, self.castling, self.en_passant, self.fifty_move, self.key, self.attack_maps = self.moves.pop()
+
+        color = (move >> COLOR_SHIFT) & 1
+        them = color ^ 1
+        self.toMove = color
+        from_sq = move & SQUARE_MASK
+        to_sq = (move >> TO_SHIFT) & SQUARE_MASK
+        piece_type = (move >> PIECE_SHIFT) & 7
+        promotion = (move >> PROMOTION_SHIFT) & 7
+        from_bb = 1 << from_sq
+        to_bb = 1 << to_sq
+        boards = self.boards[color]
+
+        boards[promotion if promotion != PAWN else piece_type] ^= to_bb
+        boards[piece_type] |= from_bb
+        self.occupancy[color] ^= from_bb | to_bb
+        self.mailbox[from_sq] = PIECES[color][piece_type]
+        self.mailbox[to_sq] = None
+
+        if move & CASTLE_FLAG:
+            rook_from, rook_to = CASTLING_ROOK_SQUARES[to_sq]
+            boards[ROOK] ^= (1 << rook_from) | (1 << rook_to)
+            self.occupancy[color] ^= (1 << rook_from) | (1 << rook_to)
+            self.mailbox[rook_from] = self.mailbox[rook_to]
+            self.mailbox[rook_to] = None
+
+        if captured_piece is not None:
+            if move & EN_PASSANT_FLAG:
+                captured_sq = to_sq - 8 if color == WHITE else to_sq + 8
             else:
-                if to_sq == Square.G8:
-                    self.boards[color][PieceType.KING] = set_bit(clear_bit(self.boards[color][PieceType.KING], Square.G8), Square.E8)
-                    self.boards[color][PieceType.ROOK] = set_bit(clear_bit(self.boards[color][PieceType.ROOK], Square.F8), Square.H8)
-                elif to_sq == Square.C8:
-                    self.boards[color][PieceType.KING] = set_bit(clear_bit(self.boards[color][PieceType.KING], Square.C8), Square.E8)
-                    self.boards[color][PieceType.ROOK] = set_bit(clear_bit(self.boards[color][PieceType.ROOK], Square.D8), Square.A8)
-
-        elif move.is_en_passant:
-            self.boards[color][PieceType.PAWN] = set_bit(clear_bit(self.boards[color][PieceType.PAWN], to_sq), from_sq)
-            captured_sq = to_sq - 8 if color == Color.WHITE else to_sq + 8
-            self.boards[opp_color][PieceType.PAWN] = set_bit(self.boards[opp_color][PieceType.PAWN], captured_sq)
-            self.en_passant = captured_sq
-
-        elif move.promotion_type != PieceType.PAWN:
-            self.boards[color][move.promotion_type] = clear_bit(self.boards[color][move.promotion_type], to_sq)
-            self.boards[color][PieceType.PAWN] = set_bit(self.boards[color][PieceType.PAWN], from_sq)
-
-        else:
-            self.boards[color][move.piece_type] = clear_bit(self.boards[color][move.piece_type], to_sq)
-            self.boards[color][move.piece_type] = set_bit(self.boards[color][move.piece_type], from_sq)
-
-        if move.is_capture and captured_piece is not None and not move.is_en_passant:
-            self.boards[opp_color][captured_piece] = set_bit(self.boards[opp_color][captured_piece], to_sq)
+                captured_sq = to_sq
+            self.boards[them][captured_piece] |= 1 << captured_sq
+            self.occupancy[them] |= 1 << captured_sq
+            self.mailbox[captured_sq] = PIECES[them][captured_piece]
 
+        self.occupied = self.occupancy[0] | self.occupancy[1]
 
 
 if __name__ == '__main__':
     game = State()
 
-    game.move_piece(Move(Color.WHITE, PieceType.PAWN, Square.E2, Square.E4))
-    game.move_piece(Move(Color.BLACK, PieceType.PAWN, Square.H7, Square.H5))
-    game.move_piece(Move(Color.WHITE, PieceType.PAWN, Square.E4, Square.E5))
-    game.move_piece(Move(Color.BLACK, PieceType.PAWN, Square.D7, Square.D5))
-    game.en_passant = Square.D6
+    game.make(encode_move(Color.WHITE, PieceType.PAWN, Square.E2, Square.E4))
+    game.make(encode_move(Color.BLACK, PieceType.PAWN, Square.H7, Square.H5))
+    game.make(encode_move(Color.WHITE, PieceType.PAWN, Square.E4, Square.E5))
+    game.make(encode_move(Color.BLACK, PieceType.PAWN, Square.D7, Square.D5))
+    print('En passant square: ', SQUARE_NAMES[game.en_passant])
     sum = 0
     # computer warmup
     for i in range(1000):
@@ -295,7 +359,8 @@ if __name__ == '__main__':
     begin_time = time.time()
 
     for _ in range(10000):
-        game.en_passant(Move(Color.WHITE, PieceType.PAWN, Square.E5, Square.D6, is_en_passant=True))
+        game.make(encode_move(Color.WHITE, PieceType.PAWN, Square.E5, Square.D6, flags=CAPTURE_FLAG | EN_PASSANT_FLAG))
+        game.unmake()
 
     end_time = time.time()
 
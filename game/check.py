@@ -1,40 +1,87 @@
 from bitboard import State
-from constants import Color, Square
+from constants import Color, Square, WHITE, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
 from utils import *
-from bit_ops import bitScanForward
+from attacks import bishop_attacks, rook_attacks, KNIGHT_ATTACKS, PAWN_ATTACKS, BETWEEN
+from move import move_from, move_to
 
 
-def is_in_check(state: State, color: Color) -> int:
-    king_square = bitScanForward(state.boards[color][PieceType.KING])
+def is_in_check(state: State, color: Color) -> bool:
+    return bool(state.attacked_by(color ^ 1) & state.boards[color][KING])
 
-    return is_square_attacked(state, king_square)
+
+def _line_blockers(state: State, king_sq: int, sniper_color: int) -> dict[int, int]:
+    """
+    Pieces of the side to move that are the only thing between king_sq and a slider of sniper_color,
+    each mapped to the ray between the king and that slider, slider included.
+    """
+    snipers_bbs = state.boards[sniper_color]
+    opponent_occupied_bb = state.get_occupied_by_color(state.toMove ^ 1)
+    all_pieces = state.get_all_occupied_squares()
+
+    # Looking out from the king through the side to move's pieces finds every slider lined up behind them
+    snipers = rook_attacks(king_sq, opponent_occupied_bb) & (snipers_bbs[ROOK] | snipers_bbs[QUEEN])
+    snipers |= bishop_attacks(king_sq, opponent_occupied_bb) & (snipers_bbs[BISHOP] | snipers_bbs[QUEEN])
+
+    blockers_map = {}
+    while snipers:
+        sniper_sq = lsb_index(snipers)
+        snipers &= snipers - 1
+
+        ray = BETWEEN[king_sq][sniper_sq]
+        blockers = ray & all_pieces
+        if blockers and not blockers & (blockers - 1):  # Exactly one piece in the way
+            blockers_map[lsb_index(blockers)] = ray | (1 << sniper_sq)
+    return blockers_map
+
+
+def pin_masks(state: State, king_sq: int) -> dict[int, int]:
+    """
+    Maps every pinned piece of the side to move to the squares it may still move to:
+    the ray between its king and the pinner, pinner included.
+    """
+    return _line_blockers(state, king_sq, state.toMove ^ 1)
+
+
+class CheckInfo:
+    """
+    What it takes for the side to move to give check, computed once per position:
+    check_squares[piece] are the squares from which that piece would attack the enemy king,
+    discoverers maps our pieces shielding the enemy king from one of our sliders to that slider's ray.
+    """
+    __slots__ = ('king_sq', 'check_squares', 'discoverers')
+
+    def __init__(self, state: State):
+        them = state.toMove ^ 1
+        self.king_sq = lsb_index(state.boards[them][KING])
+        occupancy = state.get_all_occupied_squares()
+
+        bishop_squares = bishop_attacks(self.king_sq, occupancy)
+        rook_squares = rook_attacks(self.king_sq, occupancy)
+        self.check_squares = [0] * 6
+        self.check_squares[PAWN] = PAWN_ATTACKS[them][self.king_sq]
+        self.check_squares[KNIGHT] = KNIGHT_ATTACKS[self.king_sq]
+        self.check_squares[BISHOP] = bishop_squares
+        self.check_squares[ROOK] = rook_squares
+        self.check_squares[QUEEN] = bishop_squares | rook_squares
+
+        self.discoverers = _line_blockers(state, self.king_sq, state.toMove)
 
 
 def pinned(state: State, piece_sq: Square, king_sq: Square) -> bool:
-    ray_directions = [-8, -7, 1, 9, 8, 7, -1, -9]
-    own_color = state.toMove
-    all_pieces = state.get_all_occupied_squares()
+    return piece_sq in pin_masks(state, king_sq)
+
+
+def en_passant_exposes_king(state: State, move: int, king_sq: int) -> bool:
+    """
+    En passant removes two pawns from the board at once, which the pin masks cannot see
+    (e.g. king and rook on the same rank with only the two pawns between them).
+    """
+    color = state.toMove
+    enemy = state.boards[color ^ 1]
+    to_sq = move_to(move)
+    captured_sq = to_sq - 8 if color == WHITE else to_sq + 8
+    occupancy = (state.get_all_occupied_squares() & ~(1 << move_from(move)) & ~(1 << captured_sq)) | (1 << to_sq)
 
-    for direction in ray_directions:
-        current = king_sq + direction
-        found_piece = False
-
-        while 0 <= current < 64 and is_along_ray(king_sq, current, piece_sq):
-            if get_bit(all_pieces, current):
-                if not found_piece:
-                    if current != piece_sq:
-                        break  # not our piece on ray
-                    found_piece = True
-                else:
-                    attacker_piece = state.piece_on_square(current)
-                    attacker_color = state.color_on_square(current)
-                    if attacker_color != own_color:
-                        if direction in [-8, 8, -1, 1]:
-                            if attacker_piece in (PieceType.ROOK, PieceType.QUEEN):
-                                return True
-                        elif direction in [-9, -7, 7, 9]:
-                            if attacker_piece in (PieceType.BISHOP, PieceType.QUEEN):
-                                return True
-                    break  # Not a pin
-            current += direction
-    return False
+    if rook_attacks(king_sq, occupancy) & (enemy[ROOK] | enemy[QUEEN]):
+        return True
+    return bool(bishop_attacks(king_sq, occupancy) & (enemy[BISHOP] | enemy[QUEEN]))
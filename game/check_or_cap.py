@@ -1,51 +1,61 @@
-from utils import is_square_attacked
-from constants import Square, Color, PieceType
-from bitboard import State
-from move import Move
+from constants import WHITE, PAWN, KNIGHT, BISHOP, ROOK, QUEEN
+from bitboard import State, CASTLING_ROOK_SQUARES
+from move import Move, move_from, move_to, move_piece_type, move_promotion, CASTLE_FLAG, EN_PASSANT_FLAG
 from bit_ops import *
-import sys
+from attacks import bishop_attacks, rook_attacks
+from check import CheckInfo
 
-def is_capture(state: State, move: Move) -> bool:
-    if move.is_en_passant:
+def is_capture(state: State, move: int) -> bool:
+    if move & EN_PASSANT_FLAG:
         return True
 
     opponent_occupied_bb = state.get_occupied_by_color(state.toMove ^ 1)
-    return get_bit(opponent_occupied_bb, move.to_sq.value)
-
-def is_check(state: State, move: Move) -> bool:
-    state.toMove ^= 1
-    king_sq = lsb_index(state.boards[state.toMove][PieceType.KING])
-    in_check = is_square_attacked(state, Square(king_sq))
-
-    state.toMove ^= 1
-    return in_check
-
-def annotate_moves_with_check_and_capture(state: State, moves: list[Move]):
-    
-    annotated_moves = []
-    for move in moves:
-        
-        target_piece = state.piece_on_square(move.to_sq)
-        
-        move.is_capture = target_piece is not None or move.is_en_passant
-        if move.is_capture and move.promotion_type == PieceType.PAWN:
-            if move.is_en_passant:
-                state.en_passant()
-            else:
-                state.capture(move)
-        elif move.promotion_type != PieceType.PAWN:
-            state.promote(move)
-
-        elif move.is_castle:
-            state.castle(move)
-
-        else:
-            state.move_piece(move)
-
-        move.is_check = is_check(state, move)
-
-        state.unmake_move()
+    return get_bit(opponent_occupied_bb, move_to(move))
+
+def gives_check(state: State, move: int, info: CheckInfo) -> bool:
+    """
+    Whether a legal move of the side to move checks the enemy king, from bitmasks alone.
+    Castling, promotions and en passant move or remove more than one piece and recompute
+    the sliders against the occupancy after the move.
+    """
+    from_sq = move_from(move)
+    to_sq = move_to(move)
+    to_bb = 1 << to_sq
+
+    if not move & (CASTLE_FLAG | EN_PASSANT_FLAG) and move_promotion(move) == PAWN:
+        if to_bb & info.check_squares[move_piece_type(move)]:
+            return True
+        ray = info.discoverers.get(from_sq)
+        return ray is not None and not to_bb & ray  # Leaving the slider's line uncovers it
+
+    color = state.toMove
+    ours = state.boards[color]
+    occupancy = state.get_all_occupied_squares() & ~(1 << from_sq) | to_bb
+    rooks_bb = ours[ROOK] | ours[QUEEN]
+    bishops_bb = ours[BISHOP] | ours[QUEEN]
+
+    if move & CASTLE_FLAG:
+        rook_from, rook_to = CASTLING_ROOK_SQUARES[to_sq]
+        occupancy = occupancy & ~(1 << rook_from) | (1 << rook_to)
+        rooks_bb = rooks_bb & ~(1 << rook_from) | (1 << rook_to)
+    elif move & EN_PASSANT_FLAG:
+        occupancy &= ~(1 << (to_sq - 8 if color == WHITE else to_sq + 8))
+        if to_bb & info.check_squares[PAWN]:
+            return True
+    else:
+        promotion = move_promotion(move)
+        if promotion == KNIGHT and to_bb & info.check_squares[KNIGHT]:
+            return True
+        if promotion in (ROOK, QUEEN):
+            rooks_bb |= to_bb
+        if promotion in (BISHOP, QUEEN):
+            bishops_bb |= to_bb
+
+    if rook_attacks(info.king_sq, occupancy) & rooks_bb:
+        return True
+    return bool(bishop_attacks(info.king_sq, occupancy) & bishops_bb)
 
-        annotated_moves.append(move)
 
-    return annotated_moves
+def annotate_moves_with_check_and_capture(state: State, moves: list[int]) -> list[Move]:
+    info = CheckInfo(state)
+    return [Move.from_code(move, is_check=gives_check(state, move, info)) for move in moves]
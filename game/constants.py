@@ -24,6 +24,14 @@ class Color(IntEnum):
     WHITE = 0
     BLACK = 1
 
+# Plain int copies for move generation, attacks and make/unmake. Reading an IntEnum member or calling
+# Square(...) is a Python-level call, so the enums are only used for printing, notation and the public API.
+WHITE, BLACK = 0, 1
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+NO_SQUARE = 64
+A1, B1, C1, D1, E1, F1, G1, H1 = range(8)
+A8, B8, C8, D8, E8, F8, G8, H8 = range(56, 64)
+
 PIECE_SYMBOLS = [
     ['P', 'N', 'B', 'R', 'Q', 'K'],   # White
     ['p', 'n', 'b', 'r', 'q', 'k'],   # Black
@@ -42,10 +50,18 @@ SQUARE_NAMES = [
 
 RANK_1 = 0xFF        # 0b0000000011111111 (for index 0-7)
 RANK_2 = 0xFF00      # for index 8-15
+RANK_3 = 0xFF0000    # for index 16-23
+RANK_6 = 0xFF0000000000    # for index 40-47
 RANK_7 = 0xFF000000000000  # for index 48-55
 RANK_8 = 0xFF00000000000000 # for index 56-63
 
 FILE_A = 0x0101010101010101 # Every 8th bit starting from bit 0
 FILE_H = 0x8080808080808080 # Every 8th bit starting from bit 7
 
-KNIGHT_OFFSETS = [17, 15, 10, 6, -6, -10, -15, -17]
\ No newline at end of file
+ALL_SQUARES = 0xFFFFFFFFFFFFFFFF
+
+KNIGHT_OFFSETS = [17, 15, 10, 6, -6, -10, -15, -17]
+
+PIECE_VALUES = [100, 320, 330, 500, 900, 20000] # Centipawns, indexed by piece type
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
\ No newline at end of file
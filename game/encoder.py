@@ -0,0 +1,81 @@
+"""
+Network input planes from bitboards.
+
+encode() fills a (B, PLANES, 8, 8) array straight from a BoardBatch: each 64-bit board is viewed as its
+eight rank bytes and the bits are spread over the files with array shifts, so nothing loops per square.
+Row r, column f of a plane is square r * 8 + f (row 0 is rank 1, column 0 the a-file), as in State.boards.
+
+    planes = np.empty((len(batch), PLANES, 8, 8), dtype=np.float32)
+    encode(batch, planes)    # refill the same buffer for every batch
+"""
+import sys
+
+import numpy as np
+
+from batch import BoardBatch
+from bitboard import State
+from constants import NO_SQUARE
+
+# 0-5 white pawn..king, 6-11 black pawn..king, then side to move (all ones when black is to move),
+# castling rights K, Q, k, q and the en passant target square
+PIECE_PLANES = 12
+SIDE_TO_MOVE_PLANE = 12
+CASTLING_PLANES = 13
+EN_PASSANT_PLANE = 17
+PLANES = 18
+
+FILE_SHIFTS = np.arange(8, dtype=np.uint8)
+CASTLING_SHIFTS = np.arange(4, dtype=np.uint8)
+
+
+def encode(batch: BoardBatch, out: np.ndarray | None = None, dtype: type = np.float32) -> np.ndarray:
+    """
+    Writes the input planes of every position in the batch into out, allocating it only when none is given.
+    """
+    size = len(batch)
+    if out is None:
+        out = np.empty((size, PLANES, 8, 8), dtype=dtype)
+    elif out.shape != (size, PLANES, 8, 8):
+        raise ValueError(f"out has shape {out.shape}, expected {(size, PLANES, 8, 8)}")
+
+    boards = batch.boards.reshape(size, PIECE_PLANES)
+    if sys.byteorder != 'little':
+        boards = boards.astype('<u8')
+    rank_bytes = boards.view(np.uint8).reshape(size, PIECE_PLANES, 8, 1)  # Byte r of a board is rank r
+
+    piece_planes = out[:, :PIECE_PLANES]
+    if out.dtype == np.uint8:
+        np.right_shift(rank_bytes, FILE_SHIFTS, out=piece_planes)
+        np.bitwise_and(piece_planes, 1, out=piece_planes)
+    else:
+        piece_planes[...] = np.unpackbits(rank_bytes, axis=3, count=8, bitorder='little')
+
+    out[:, SIDE_TO_MOVE_PLANE] = batch.to_move[:, None, None]
+    out[:, CASTLING_PLANES:EN_PASSANT_PLANE] = ((batch.castling[:, None] >> CASTLING_SHIFTS) & 1)[:, :, None, None]
+
+    out[:, EN_PASSANT_PLANE] = 0
+    rows = np.flatnonzero(batch.en_passant != NO_SQUARE)
+    squares = batch.en_passant[rows]
+    out[rows, EN_PASSANT_PLANE, squares // 8, squares % 8] = 1
+    return out
+
+
+def encode_states(states: list[State], out: np.ndarray | None = None, dtype: type = np.float32) -> np.ndarray:
+    return encode(BoardBatch.from_states(states), out, dtype)
+
+
+if __name__ == '__main__':
+    import time
+
+    state = State.from_fen("rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR b KQq e3 0 3")
+    planes = encode_states([state], dtype=np.uint8)
+    print("white pawns:\n", planes[0, 0][::-1])
+    print("en passant:\n", planes[0, EN_PASSANT_PLANE][::-1])
+
+    batch = BoardBatch(4096)
+    batch.boards[:] = np.array(state.boards, dtype=np.uint64)
+    buffer = np.empty((len(batch), PLANES, 8, 8), dtype=np.float32)
+    start = time.perf_counter()
+    for _ in range(100):
+        encode(batch, buffer)
+    print(f"{100 * len(batch) / (time.perf_counter() - start):.0f} positions/s")
@@ -1,28 +1,29 @@
 from bitboard import State
 from move import Move
-from legal_moves import legal_moves
+from legal_moves import legal_moves, has_legal_move
 from constants import Color
-from constants import PieceType
+from constants import PieceType, WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN
 from bit_ops import lsb_index, popcount
 from legal_king_moves import is_in_check
 
 
 def fifty_move_rule(state: State) -> bool:
-    return state.fifty_move == 50
+    return state.fifty_move >= 100  # Half-move clock, which can start above zero from a FEN
 
 def num_pieces(state: State) -> int:
         return popcount(state.get_all_occupied_squares())
 
-def check_or_stale_mate(state: State, moves: list[Move]) -> float:
-    if not moves:
+def check_or_stale_mate(state: State, moves: list[Move] | None = None) -> float:
+    # Without a move list only the existence of a legal move is checked, which stops at the first one
+    if not (moves if moves is not None else has_legal_move(state)):
         if is_in_check(state):
-            return 1 if state.toMove == Color.BLACK else -1
+            return 1 if state.toMove == BLACK else -1
         return 0.5  # stalemate
     return 0
 
 def count_pieces(state: State, color: Color) -> dict[PieceType, int]:
     counts = {}
-    for piece_type in [PieceType.PAWN, PieceType.KNIGHT, PieceType.BISHOP, PieceType.ROOK, PieceType.QUEEN]:
+    for piece_type in [PAWN, KNIGHT, BISHOP, ROOK, QUEEN]:
         piece_bitboard = state.boards[color][piece_type]
         counts[piece_type] = popcount(piece_bitboard)
     return counts
@@ -50,19 +51,19 @@ def is_insufficient_material(state: State) -> bool:
         return ((sq // 8 + sq % 8) % 2) == 0
     
     def heavy_pieces_or_pawns_exist(state: State) -> bool: # Quick check to begin
-        return lsb_index(state.boards[0][PieceType.PAWN] | state.boards[0][PieceType.ROOK] | state.boards[0][PieceType.QUEEN] | state.boards[1][PieceType.PAWN] | state.boards[1][PieceType.ROOK] | state.boards[PieceType.QUEEN]) != -1
+        return lsb_index(state.boards[0][PAWN] | state.boards[0][ROOK] | state.boards[0][QUEEN] | state.boards[1][PAWN] | state.boards[1][ROOK] | state.boards[1][QUEEN]) != -1
     
     if heavy_pieces_or_pawns_exist(state):
         return False 
 
-    white_pieces = count_pieces(state, Color.WHITE)
-    black_pieces = count_pieces(state, Color.BLACK)
+    white_pieces = count_pieces(state, WHITE)
+    black_pieces = count_pieces(state, BLACK)
 
     # At this point, only kings and minor pieces are left.
-    white_knights = white_pieces[PieceType.KNIGHT]
-    white_bishops = white_pieces[PieceType.BISHOP]
-    black_knights = black_pieces[PieceType.KNIGHT]
-    black_bishops = black_pieces[PieceType.BISHOP]
+    white_knights = white_pieces[KNIGHT]
+    white_bishops = white_pieces[BISHOP]
+    black_knights = black_pieces[KNIGHT]
+    black_bishops = black_pieces[BISHOP]
 
     total_minor_pieces = white_knights + white_bishops + black_knights + black_bishops
 
@@ -82,8 +83,8 @@ def is_insufficient_material(state: State) -> bool:
 
         # King + Bishop vs King + Bishop, with both bishops on the same color squares
         if white_bishops == 1 and black_bishops == 1:
-            white_bishop_sq = get_squares_from_bitboard(state.boards[Color.WHITE][PieceType.BISHOP])[0]
-            black_bishop_sq = get_squares_from_bitboard(state.boards[Color.BLACK][PieceType.BISHOP])[0]
+            white_bishop_sq = get_squares_from_bitboard(state.boards[WHITE][BISHOP])[0]
+            black_bishop_sq = get_squares_from_bitboard(state.boards[BLACK][BISHOP])[0]
             # Return true if both bishops are on the same color of squares
             return is_light_square(white_bishop_sq) == is_light_square(black_bishop_sq)
     return False
\ No newline at end of file
@@ -1,79 +1,80 @@
-from move import Move
+from move import encode_move, move_to, TO_SHIFT, CAPTURE_FLAG, CASTLE_FLAG
 from bitboard import State
 from bit_ops import *
 from constants import *
-from utils import is_square_attacked
+from attacks import KING_ATTACKS, BETWEEN, attack_map
 
 
 def is_in_check(state: State) -> bool:
-    king_sq = lsb_index(state.boards[state.toMove][PieceType.KING])
-    return is_square_attacked(state, Square(king_sq))
+    return bool(state.attacked_by(state.toMove ^ 1) & state.boards[state.toMove][KING])
 
 
-def castleMoves(state: State) -> list[Move]:
+# Per color: (castling right, rook square, squares that must be empty, squares the king passes incl. its own, king destination)
+CASTLING_PATHS = [
+    [(0b0001, H1, BETWEEN[E1][H1], (1 << E1) | (1 << F1) | (1 << G1), G1),
+     (0b0010, A1, BETWEEN[E1][A1], (1 << E1) | (1 << D1) | (1 << C1), C1)],
+    [(0b0100, H8, BETWEEN[E8][H8], (1 << E8) | (1 << F8) | (1 << G8), G8),
+     (0b1000, A8, BETWEEN[E8][A8], (1 << E8) | (1 << D8) | (1 << C8), C8)],
+]
+KING_HOME = [E1, E8]
+
+
+def castleMoves(state: State, danger: int | None = None) -> list[int]:
+    """
+    `danger` is the opponent's attack map, the position's cached one unless the caller passes its own.
+    """
     color = state.toMove
     moves = []
     occupied = state.get_all_occupied_squares()
+    rooks = state.boards[color][ROOK] # The right alone is not enough once the rook has been captured
+    if danger is None:
+        danger = state.attacked_by(color ^ 1)
 
-    if color == Color.WHITE:
-        if state.castling & 0b0001:  # White kingside
-            if not (get_bit(occupied, Square.F1) or get_bit(occupied, Square.G1)):
-                if not is_square_attacked(state, Square.E1) and \
-                   not is_square_attacked(state, Square.F1) and \
-                   not is_square_attacked(state, Square.G1):
-                    moves.append(Move(Color.WHITE, PieceType.KING, Square.E1, Square.G1, is_castle=True))
-
-        if state.castling & 0b0010:  # White queenside
-            if not (get_bit(occupied, Square.B1) or get_bit(occupied, Square.C1) or get_bit(occupied, Square.D1)):
-                if not is_square_attacked(state, Square.E1) and \
-                   not is_square_attacked(state, Square.D1) and \
-                   not is_square_attacked(state, Square.C1):
-                    moves.append(Move(Color.WHITE, PieceType.KING, Square.E1, Square.C1, is_castle=True))
-
-    else:
-        if state.castling & 0b0100:  # Black kingside
-            if not (get_bit(occupied, Square.F8) or get_bit(occupied, Square.G8)):
-                if not is_square_attacked(state, Square.E8) and \
-                   not is_square_attacked(state, Square.F8) and \
-                   not is_square_attacked(state, Square.G8):
-                    moves.append(Move(Color.BLACK, PieceType.KING, Square.E8, Square.G8, is_castle=True))
-
-        if state.castling & 0b1000:  # Black queenside
-            if not (get_bit(occupied, Square.B8) or get_bit(occupied, Square.C8) or get_bit(occupied, Square.D8)):
-                if not is_square_attacked(state, Square.E8) and \
-                   not is_square_attacked(state, Square.D8) and \
-                   not is_square_attacked(state, Square.C8):
-                    moves.append(Move(Color.BLACK, PieceType.KING, Square.E8, Square.C8, is_castle=True))
+    for right, rook_sq, empty_mask, king_path, king_to in CASTLING_PATHS[color]:
+        if state.castling & right and get_bit(rooks, rook_sq) and not occupied & empty_mask and not danger & king_path:
+            moves.append(encode_move(color, KING, KING_HOME[color], king_to, flags=CASTLE_FLAG))
 
     return moves
 
-def kingMoves(state: State, attacker_ct: int) -> list[Move]:
+def king_danger(state: State, attacker_ct: int) -> int:
+    """
+    Squares the side to move's king may not step to: the opponent's attack map, seen through the king when in check.
+    """
+    color = state.toMove
+    if attacker_ct:
+        # In check the king must be taken off the board, or it would shelter from the checking slider behind itself
+        occupancy = state.get_all_occupied_squares() & ~state.boards[color][KING]
+        return attack_map(state.boards[color ^ 1], color ^ 1, occupancy)
+    return state.attacked_by(color ^ 1)  # No slider ray reaches the king, so removing it changes nothing
+
+
+def kingMoves(state: State, attacker_ct: int, targets: int = ALL_SQUARES) -> list[int]:
+    """
+    Only king steps and castles landing on `targets` are produced, e.g. the opponent's pieces for captures only.
+    """
     color = state.toMove
     moves = []
 
-    king_bb = state.boards[color][PieceType.KING]
+    king_bb = state.boards[color][KING]
     from_sq_idx = lsb_index(king_bb)
-    from_sq = Square(from_sq_idx)
+    base = encode_move(color, KING, from_sq_idx, 0)
 
     own_occ = state.get_occupied_by_color(color)
     opp_occ = state.get_occupied_by_color(color ^ 1)
 
-    deltas = [-9, -8, -7, -1, +1, +7, +8, +9]
-    for d in deltas:
-        to_sq_idx = from_sq_idx + d
-        if 0 <= to_sq_idx < 64:
-            file_diff = abs((from_sq_idx - to_sq_idx) % 8)
-            if file_diff <= 1 and not get_bit(own_occ, to_sq_idx):
-                is_capture = get_bit(opp_occ, to_sq_idx)
-                move = Move(color, PieceType.KING, from_sq, Square(to_sq_idx), is_capture=is_capture)
-                state.move_piece(move)
-                if not is_square_attacked(state, Square(to_sq_idx)):
-                    moves.append(Move(color, PieceType.KING, from_sq, Square(to_sq_idx), is_capture=is_capture))
-                state.unmake_move()
+    danger = king_danger(state, attacker_ct)
+
+    targets_bb = KING_ATTACKS[from_sq_idx] & ~own_occ & ~danger & targets
+    while targets_bb:
+        to_sq_idx = lsb_index(targets_bb)
+        targets_bb &= targets_bb - 1
+
+        flags = CAPTURE_FLAG if get_bit(opp_occ, to_sq_idx) else 0
+        moves.append(base | (to_sq_idx << TO_SHIFT) | flags)
 
     if attacker_ct == 0:
         # Can't castle out of check
-        moves.extend(castleMoves(state))
+        moves.extend(move for move in castleMoves(state, danger) if (1 << move_to(move)) & targets)
 
     return moves
 
@@ -81,5 +82,5 @@ def kingMoves(state: State, attacker_ct: int) -> list[Move]:
 if __name__ == '__main__':
     state = State()
 
-    move = Move(Color.WHITE, PieceType.PAWN, Square.E2, Square.E4)
-    state.move_piece(move)
\ No newline at end of file
+    move = encode_move(Color.WHITE, PieceType.PAWN, Square.E2, Square.E4)
+    state.make(move)
\ No newline at end of file
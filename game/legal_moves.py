@@ -1,70 +1,273 @@
-from check import pinned
+from check import pin_masks, en_passant_exposes_king
 from possible_piece_moves import *
-from utils import is_square_attacked, attackers_to_square, squares_between, is_along_ray
+from utils import attackers_to_square
 from bitboard import State
-from move import Move
+from move import Move, move_from, move_to, move_piece_type, move_promotion, move_color, CAPTURE_FLAG, CASTLE_FLAG, EN_PASSANT_FLAG
 from bit_ops import *
-from legal_king_moves import kingMoves
-from check_or_cap import is_check, is_capture, annotate_moves_with_check_and_capture
+from legal_king_moves import kingMoves, castleMoves, king_danger
+from attacks import bishop_attacks, rook_attacks, queen_attacks, KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, BETWEEN, attack_map
+from check_or_cap import annotate_moves_with_check_and_capture
 import time
 
 
-def legal_moves(state: State) -> list[Move]:
+def check_and_pin_masks(state: State) -> tuple[int, int, int, dict[int, int]]:
+    """
+    Everything move generation needs to know about the side to move's king, found once per position:
+    its square, the number of checkers, the check mask (squares a non-king move must land on)
+    and the pin map (pinned square -> allowed ray).
+    """
+    king_loc = lsb_index(state.boards[state.toMove][KING])
     
-    total_moves: list[Move] = []
-
-    king_loc = lsb_index(state.boards[state.toMove][PieceType.KING])
-    
-    attackers_bb = attackers_to_square(state, Square(king_loc))
+    attackers_bb = attackers_to_square(state, king_loc, color=state.toMove ^ 1)
     
     attackers_count = popcount(attackers_bb)  
-    in_check = attackers_count > 0
-    king_moves = annotate_moves_with_check_and_capture(state, kingMoves(state, attackers_count))
-
-    for move in king_moves:
-            total_moves.append(move)
 
     if attackers_count == 2:
-        return total_moves  
+        valid_targets = 0  # Only the king can answer a double check
 
-    if attackers_count == 1:
+    elif attackers_count == 1:
         # If in single check, pieces can only move to capture the checker or block its path.
+        # Nothing lies between the king and a contact or knight check, so BETWEEN adds no squares there.
         checker_sq = lsb_index(attackers_bb)
-        valid_targets = 1 << checker_sq  # The checker's square is a valid target, assuming only attacker
-
-        checker_piece = state.piece_on_square(checker_sq)
-        if checker_piece and checker_piece in (PieceType.BISHOP, PieceType.ROOK, PieceType.QUEEN):
-            
-            valid_targets |= squares_between(king_loc, checker_sq)
+        valid_targets = attackers_bb | BETWEEN[king_loc][checker_sq]
     else:
         # If not in check, all squares are potentially valid targets.
-        valid_targets = 0xFFFFFFFFFFFFFFFF
+        valid_targets = ALL_SQUARES
+
+    return king_loc, attackers_count, valid_targets, pin_masks(state, king_loc)
+
 
+def piece_move_codes(state: State, targets: int, king_loc: int, pins: dict[int, int]) -> list[int]:
+    """
+    Legal non-king moves landing on targets, which must already be narrowed to the check mask.
+    """
+    total_moves: list[int] = []
+
+    # Generators intersect each piece's targets with the check mask and, for pinned pieces,
+    # with the pin ray, so nothing needs filtering afterwards.
     gen_funcs = [pawnMoves, knightMoves, bishopMoves, rookMoves, queenMoves]
 
-    moves = [move 
-         for gen_func in gen_funcs 
-         for move in annotate_moves_with_check_and_capture(state, gen_func(state))]
-
-    for move in moves:
-        
-        piece_pinned: bool = pinned(state, move.from_sq, king_loc)
-        square_bit = 1 << move.to_sq
-
-        if in_check:
-            if ((square_bit & valid_targets) != 0) and not piece_pinned: 
-                total_moves.append(move)
-            continue
-        if piece_pinned:
-            if is_along_ray(king_loc, move.from_sq, move.to_sq):
-                total_moves.append(move)
-            continue  # Pinned piece moving illegally
-        if ((1 << move.to_sq) & valid_targets):
-            total_moves.append(move)
+    for gen_func in gen_funcs:
+        total_moves.extend(gen_func(state, targets, pins))
+
+    if state.en_passant != NO_SQUARE:
+        total_moves = [
+            move for move in total_moves
+            if not (move & EN_PASSANT_FLAG and en_passant_exposes_king(state, move, king_loc))
+        ]
 
     return total_moves
 
 
+def legal_move_codes(state: State) -> list[int]:
+    king_loc, attackers_count, valid_targets, pins = check_and_pin_masks(state)
+
+    total_moves = kingMoves(state, attackers_count)
+    if attackers_count < 2:
+        total_moves.extend(piece_move_codes(state, valid_targets, king_loc, pins))
+    return total_moves
+
+
+def capture_move_codes(state: State) -> list[int]:
+    """
+    Legal captures and promotions only, for quiescence search and exchange evaluation.
+    Quiet moves are never generated: every generator gets a target mask of enemy pieces
+    (plus the en passant square, and the empty promotion squares for pawns).
+    """
+    king_loc, attackers_count, valid_targets, pins = check_and_pin_masks(state)
+    color = state.toMove
+    opponent_occupied_bb = state.get_occupied_by_color(color ^ 1)
+
+    total_moves = kingMoves(state, attackers_count, opponent_occupied_bb)
+    if attackers_count == 2:
+        return total_moves
+
+    capture_targets = valid_targets & (opponent_occupied_bb | (1 << state.en_passant))
+    total_moves.extend(move for move in piece_move_codes(state, capture_targets, king_loc, pins) if move & CAPTURE_FLAG)
+
+    promotion_rank_bb = RANK_8 if color == WHITE else RANK_1
+    total_moves.extend(pawnMoves(state, valid_targets & ~state.get_all_occupied_squares() & promotion_rank_bb, pins))
+    return total_moves
+
+
+def evasion_move_codes(state: State) -> list[int]:
+    """
+    Replies to a check: king steps, plus captures of or interpositions against a single checker.
+    The other pieces only ever see the check mask as targets, and a double check skips them entirely.
+    Returns an empty list when the side to move is not in check.
+    """
+    king_loc, attackers_count, valid_targets, pins = check_and_pin_masks(state)
+    if attackers_count == 0:
+        return []
+
+    total_moves = kingMoves(state, attackers_count)
+    if attackers_count == 1:
+        total_moves.extend(piece_move_codes(state, valid_targets, king_loc, pins))
+    return total_moves
+
+
+def _count_legal_moves(state: State, stop_at_first: bool) -> int:
+    # Popcounts of the masked target sets, piece group by piece group; no moves are built
+    king_loc, attackers_count, valid_targets, pins = check_and_pin_masks(state)
+    color = state.toMove
+    pieces = state.boards[color]
+    own_occupied_bb = state.get_occupied_by_color(color)
+    occupied = state.get_all_occupied_squares()
+
+    danger = king_danger(state, attackers_count)
+    count = popcount(KING_ATTACKS[king_loc] & ~own_occupied_bb & ~danger)
+    if attackers_count == 0:
+        count += len(castleMoves(state, danger))
+    if attackers_count == 2 or (count and stop_at_first):
+        return count
+
+    targets = valid_targets & ~own_occupied_bb
+
+    knights_bb = pieces[KNIGHT]
+    while knights_bb:
+        from_sq = lsb_index(knights_bb)
+        knights_bb &= knights_bb - 1
+        if from_sq not in pins:  # A pinned knight can never stay on its pin ray
+            count += popcount(KNIGHT_ATTACKS[from_sq] & targets)
+
+    for sliders_bb, attack_func in ((pieces[BISHOP] | pieces[QUEEN], bishop_attacks), (pieces[ROOK] | pieces[QUEEN], rook_attacks)):
+        while sliders_bb:
+            from_sq = lsb_index(sliders_bb)
+            sliders_bb &= sliders_bb - 1
+            count += popcount(attack_func(from_sq, occupied) & targets & pins.get(from_sq, ALL_SQUARES))
+    if count and stop_at_first:
+        return count
+
+    # Pawns as sets, as in pawnMoves: each move onto the last rank stands for four promotions
+    promotion_rank_bb = RANK_8 if color == WHITE else RANK_1
+    pawns_bb = pieces[PAWN]
+    pawn_sets = [(1 << sq, valid_targets & ray) for sq, ray in pins.items() if (pawns_bb >> sq) & 1]
+    pawn_sets.append((pawns_bb & ~sum(1 << sq for sq in pins), valid_targets))
+    for set_bb, allowed_bb in pawn_sets:
+        for targets_bb in pawn_target_sets(set_bb, color, ~occupied & ALL_SQUARES, state.get_occupied_by_color(color ^ 1), allowed_bb):
+            count += popcount(targets_bb & ~promotion_rank_bb) + 4 * popcount(targets_bb & promotion_rank_bb)
+
+    if state.en_passant != NO_SQUARE:
+        count += sum(
+            1 for move in pawnMoves(state, valid_targets & ((1 << state.en_passant) | state.get_occupied_by_color(color ^ 1)), pins)
+            if move & EN_PASSANT_FLAG and not en_passant_exposes_king(state, move, king_loc)
+        )
+    return count
+
+
+def count_legal_moves(state: State) -> int:
+    """
+    Number of legal moves, for perft leaves and mobility, without generating them.
+    """
+    return _count_legal_moves(state, False)
+
+
+def has_legal_move(state: State) -> bool:
+    """
+    Whether the side to move has any legal move, stopping at the first piece group that has one.
+    """
+    return _count_legal_moves(state, True) > 0
+
+
+def _pseudo_legal_targets(state: State, piece_type: int, from_sq: int) -> int:
+    # Squares the piece on from_sq could reach ignoring pins and checks, capture squares included
+    color = state.toMove
+    all_occupied_bb = state.get_all_occupied_squares()
+
+    if piece_type == PAWN:
+        forward_one = 8 if color == WHITE else -8
+        start_rank_bb = RANK_2 if color == WHITE else RANK_7
+        targets_bb = PAWN_ATTACKS[color][from_sq] & state.get_occupied_by_color(color ^ 1)
+        push_one_sq = from_sq + forward_one
+        if 0 <= push_one_sq <= 63 and not get_bit(all_occupied_bb, push_one_sq):
+            targets_bb |= 1 << push_one_sq
+            if (1 << from_sq) & start_rank_bb and not get_bit(all_occupied_bb, push_one_sq + forward_one):
+                targets_bb |= 1 << (push_one_sq + forward_one)
+        return targets_bb
+    if piece_type == KNIGHT:
+        return KNIGHT_ATTACKS[from_sq]
+    if piece_type == BISHOP:
+        return bishop_attacks(from_sq, all_occupied_bb)
+    if piece_type == ROOK:
+        return rook_attacks(from_sq, all_occupied_bb)
+    if piece_type == QUEEN:
+        return queen_attacks(from_sq, all_occupied_bb)
+    return KING_ATTACKS[from_sq]
+
+
+def is_legal(state: State, move: int) -> bool:
+    """
+    Validates a single packed move for the side to move without generating the move list:
+    the piece and flags must match the board, the piece must reach the target, and the king
+    must not be left in check.
+    """
+    color = state.toMove
+    from_sq = move_from(move)
+    to_sq = move_to(move)
+    piece_type = move_piece_type(move)
+    promotion = move_promotion(move)
+
+    if move_color(move) != color or piece_type > KING:
+        return False
+    if not get_bit(state.boards[color][piece_type], from_sq):
+        return False
+    if get_bit(state.get_occupied_by_color(color), to_sq):
+        return False
+
+    if move & CASTLE_FLAG:
+        return piece_type == KING and move in castleMoves(state)
+
+    is_ep = piece_type == PAWN and to_sq == state.en_passant and bool(PAWN_ATTACKS[color][from_sq] & (1 << to_sq))
+    captures = is_ep or bool(get_bit(state.get_occupied_by_color(color ^ 1), to_sq))
+    if bool(move & EN_PASSANT_FLAG) != is_ep or bool(move & CAPTURE_FLAG) != captures:
+        return False
+
+    reaches_last_rank = piece_type == PAWN and bool((1 << to_sq) & (RANK_8 | RANK_1))
+    if reaches_last_rank != (promotion != PAWN) or promotion >= KING:
+        return False
+
+    if not is_ep and not _pseudo_legal_targets(state, piece_type, from_sq) & (1 << to_sq):
+        return False
+
+    if piece_type == KING:
+        danger = state.attacked_by(color ^ 1)
+        if danger & (1 << from_sq):
+            # In check the king comes off the board: it may be stepping along the line of the checking slider
+            danger = attack_map(state.boards[color ^ 1], color ^ 1, state.get_all_occupied_squares() & ~(1 << from_sq))
+        return not danger & (1 << to_sq)
+
+    king_loc = lsb_index(state.boards[color][KING])
+    pin_ray = pin_masks(state, king_loc).get(from_sq)
+    if pin_ray is not None and not pin_ray & (1 << to_sq):
+        return False
+    if is_ep and en_passant_exposes_king(state, move, king_loc):
+        return False
+
+    if not state.attacked_by(color ^ 1) & (1 << king_loc):
+        return True
+
+    checkers_bb = attackers_to_square(state, king_loc, color=state.toMove ^ 1)
+    if checkers_bb & (checkers_bb - 1):
+        return False  # Double check, only the king may move
+    checker_sq = lsb_index(checkers_bb)
+    valid_targets = checkers_bb | BETWEEN[king_loc][checker_sq]
+    if is_ep:
+        captured_sq = to_sq - 8 if color == WHITE else to_sq + 8
+        return bool(((1 << to_sq) | (1 << captured_sq)) & valid_targets)
+    return bool((1 << to_sq) & valid_targets)
+
+
+def legal_moves(state: State, with_checks: bool = False) -> list[Move]:
+    """
+    Legal moves as Move objects. Check flags are only needed for notation and move ordering,
+    so they are filled in only when with_checks is set.
+    """
+    codes = legal_move_codes(state)
+    if with_checks:
+        return annotate_moves_with_check_and_capture(state, codes)
+    return [Move.from_code(move) for move in codes]
+
+
 if __name__ == '__main__':
     state = State()
     
@@ -3,24 +3,25 @@ from bitboard import State
 from move_piece import turn
 from game_over import fifty_move_rule, check_or_stale_mate, is_insufficient_material, num_pieces
 from legal_moves import legal_moves
+from see import see
 import random
 from constants import *
 from move import Move
 import time
-from edge_cases import EN_PASSANT
 from bit_ops import *
 
-def get_random_move(moves: list[Move]):
-    move = random.choice(moves)
+def get_random_move(state: State, moves: list[Move], rng: random.Random = random):
+    # Captures that lose material in the exchange are left out unless nothing else remains
+    sound_moves = [move for move in moves if not move.is_capture or see(state, move.to_code()) >= 0]
+    move = rng.choice(sound_moves or moves)
     return move
 
 
-def selected_moves(idx):
-    moves = EN_PASSANT
-    return moves[idx]
-
-
-def game(state: State) -> float:
+def game(state: State, rng: random.Random = random, moves_played: list[Move] | None = None) -> float:
+    """
+    Plays random moves until the game ends: 1 white wins, -1 black wins, 0.5 draw.
+    Pass moves_played to collect the moves in the order they were made.
+    """
     seen_boards = defaultdict(int)
 
     while True:
@@ -31,15 +32,17 @@ def game(state: State) -> float:
                 return 0.5
             return check_or_stale
         
-        move = get_random_move(moves) 
+        move = get_random_move(state, moves, rng) 
 
         turn(state, move)
+        if moves_played is not None:
+            moves_played.append(move)
 
         if num_pieces(state) < 5:
             if is_insufficient_material(state):
                 return 0.5
 
-        position_key = hash(state)
+        position_key = state.key
         if seen_boards[position_key] == 2:
             return 0.5
 
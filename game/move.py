@@ -1,6 +1,58 @@
 from constants import Square, PieceType, Color, SQUARE_NAMES, PIECE_SYMBOLS 
 
+# Packed integer move, used by generation and make/unmake:
+#   bits  0-5   from square
+#   bits  6-11  to square
+#   bits 12-14  moving piece
+#   bits 15-17  promotion piece (PieceType.PAWN means no promotion)
+#   bit  18     capture
+#   bit  19     castle
+#   bit  20     en passant
+#   bit  21     color of the side moving
+SQUARE_MASK = 0x3F
+TO_SHIFT = 6
+PIECE_SHIFT = 12
+PROMOTION_SHIFT = 15
+CAPTURE_FLAG = 1 << 18
+CASTLE_FLAG = 1 << 19
+EN_PASSANT_FLAG = 1 << 20
+COLOR_SHIFT = 21
+
+
+def encode_move(color: int, piece: int, from_sq: int, to_sq: int, promotion: int = 0, flags: int = 0) -> int:
+    return from_sq | (to_sq << TO_SHIFT) | (piece << PIECE_SHIFT) | (promotion << PROMOTION_SHIFT) | flags | (color << COLOR_SHIFT)
+
+def move_from(move: int) -> int:
+    return move & SQUARE_MASK
+
+def move_to(move: int) -> int:
+    return (move >> TO_SHIFT) & SQUARE_MASK
+
+def move_piece_type(move: int) -> int:
+    return (move >> PIECE_SHIFT) & 7
+
+def move_promotion(move: int) -> int:
+    return (move >> PROMOTION_SHIFT) & 7
+
+def move_color(move: int) -> int:
+    return (move >> COLOR_SHIFT) & 1
+
+def move_to_uci(move: int) -> str:
+    # Coordinate notation (e2e4, e7e8q), unambiguous without the position
+    promotion = move_promotion(move)
+    suffix = PIECE_SYMBOLS[1][promotion] if promotion != PieceType.PAWN else ''
+    return SQUARE_NAMES[move_from(move)] + SQUARE_NAMES[move_to(move)] + suffix
+
+
 class Move:
+    """
+    Lightweight view of a packed move for the public API (notation, edge case scripts, turn()).
+    """
+    __slots__ = (
+        'color', 'piece_type', 'from_sq', 'to_sq', 'is_capture',
+        'promotion_type', 'is_castle', 'is_check', 'is_en_passant',
+    )
+
     def __init__(self, 
                  color: Color, 
                  piece: PieceType, 
@@ -22,6 +74,27 @@ class Move:
         self.is_check = is_check
         self.is_en_passant = is_en_passant
 
+    @classmethod
+    def from_code(cls, move: int, is_check: bool = False) -> 'Move':
+        return cls(
+            Color(move_color(move)),
+            PieceType(move_piece_type(move)),
+            Square(move_from(move)),
+            Square(move_to(move)),
+            is_capture=bool(move & CAPTURE_FLAG),
+            promotion_type=PieceType(move_promotion(move)),
+            is_castle=bool(move & CASTLE_FLAG),
+            is_check=is_check,
+            is_en_passant=bool(move & EN_PASSANT_FLAG),
+        )
+
+    def to_code(self) -> int:
+        flags = 0
+        if self.is_capture: flags |= CAPTURE_FLAG
+        if self.is_castle: flags |= CASTLE_FLAG
+        if self.is_en_passant: flags |= EN_PASSANT_FLAG
+        return encode_move(self.color, self.piece_type, self.from_sq, self.to_sq, self.promotion_type, flags)
+
     def __str__(self):
         return self.notation()
     
@@ -29,10 +102,12 @@ class Move:
         return str(self.full_details())
     
     def __eq__(self, other):
-        return self.notation() == other.notation()
+        if not isinstance(other, Move):
+            return NotImplemented
+        return self.to_code() == other.to_code()
     
     def __hash__(self):
-        return self.notation()
+        return hash(self.to_code())
     
     def full_details(self):
         return (
@@ -96,3 +171,4 @@ class Move:
 if __name__ == '__main__':
     ex_move = Move(Color.WHITE, PieceType.KING, Square.E1, Square.G1, is_castle=True)
     print(ex_move)
+    print(Move.from_code(ex_move.to_code()) == ex_move)
@@ -1,81 +1,39 @@
 from bitboard import State
-from constants import Color, PieceType, Square
+from constants import Color, PieceType, Square, PAWN, QUEEN, KING
 from bit_ops import *
-from move import Move
+from move import Move, encode_move, CAPTURE_FLAG, CASTLE_FLAG, EN_PASSANT_FLAG
 from legal_moves import *
 
 
-def make_move(state: State, move: Move) -> bool:
-    state.fifty_move += 1
-    if move.piece_type == PieceType.PAWN or move.is_capture:
-        state.fifty_move = 0
-
-    if move.promotion_type != PieceType.PAWN:
-        pawn_moves = pawnMoves(state)
-
-        if move not in pawn_moves:
-            return False
-
-        state.promote(move)
-        return True
+def move_code(state: State, move: Move) -> int:
+    """
+    Packs a Move coming from outside (game records, user input), taking the capture,
+    castle and en passant flags from the board rather than trusting the caller.
+    """
+    from_sq, to_sq = int(move.from_sq), int(move.to_sq)
+    flags = 0
+    if get_bit(state.get_occupied_by_color(state.toMove ^ 1), to_sq):
+        flags |= CAPTURE_FLAG
+    if move.piece_type == KING and abs(to_sq - from_sq) == 2:
+        flags |= CASTLE_FLAG
+    elif move.piece_type == PAWN and to_sq == state.en_passant and (to_sq - from_sq) % 8:
+        flags |= CAPTURE_FLAG | EN_PASSANT_FLAG
+    return encode_move(move.color, move.piece_type, from_sq, to_sq, move.promotion_type, flags)
 
-    
-    opp_tot_bb = state.get_occupied_by_color(state.toMove ^ 1)
 
-    move.is_capture = get_bit(opp_tot_bb, move.to_sq)
-    
-
-    moves = legal_moves(state)
-
-    
-    if move not in moves:
+def make_move(state: State, move: Move) -> bool:
+    # Out of range fields would spill into the neighbouring fields of the packed move
+    if not (0 <= move.from_sq < 64 and 0 <= move.to_sq < 64 and 0 <= move.piece_type <= KING and 0 <= move.promotion_type <= QUEEN):
+        return False
+    code = move_code(state, move)
+    if not is_legal(state, code):
         return False
 
-    if move.is_castle:
-
-        state.castle(move)
-        state.fifty_move = 0
-
-        return True
-    
-    if move.is_capture:
-        if move.is_en_passant:
-            pawn_moves = pawnMoves(state)
-            if move not in pawn_moves:
-                return False
-            state.en_passant(move)
-            return True
-
-        state.capture(move)
-        return True
-    
-    state.move_piece(move)
-    
+    state.make(code)
     return True 
 
-def turn(state: State, move: Move):
-
-    if make_move(state, move):
-        if move.piece_type == PieceType.KING:
-            if move.color == Color.WHITE:
-                state.castling &= ~0b0011 
-            else:
-                state.castling &= ~0b1100 
-        elif move.piece_type == PieceType.ROOK:
-            if move.color == Color.WHITE:
-                if move.from_sq == Square.H1:
-                    state.castling &= ~0b0001  
-                elif move.from_sq == Square.A1:
-                    state.castling &= ~0b0010 
-            else:
-                if move.from_sq == Square.H8:
-                    state.castling &= ~0b0100 
-                elif move.from_sq == Square.A8:
-                    state.castling &= ~0b1000  
-        state.toMove ^= 1
-        return True
-    else:  
-        return False
+def turn(state: State, move: Move) -> bool:
+    return make_move(state, move)
 
 
 if __name__ == '__main__':
@@ -98,6 +56,6 @@ if __name__ == '__main__':
 
     for move in moves:
         state.printBoard()
-        print('Legal Moves: ', [legal.notation() for legal in legal_moves(state)])
+        print('Legal Moves: ', [legal.notation() for legal in legal_moves(state, with_checks=True)])
         print('Move Chosen', move.notation())
         turn(state, move)
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""
+Perft: counts the leaf nodes of the legal move tree to a fixed depth.
+
+The counts are compared against published reference values, so any move generation or
+make/unmake bug shows up as a mismatch, and the node rate doubles as a speed benchmark.
+
+    python perft.py                  # reference suite up to depth 3
+    python perft.py --max-depth 4    # deeper suite run
+    python perft.py 4 [FEN]          # divide: per root move node counts for one position
+"""
+import argparse
+import time
+
+from bitboard import State
+from constants import START_FEN
+from legal_moves import legal_move_codes, count_legal_moves
+from move import move_to_uci
+
+# (name, FEN, {depth: nodes}), reference counts from the Chess Programming Wiki
+PERFT_SUITE = [
+    ("startpos", START_FEN,
+     {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609}),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+     {1: 48, 2: 2039, 3: 97862, 4: 4085603}),
+    ("position 3", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+     {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624}),
+    ("position 4", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+     {1: 6, 2: 264, 3: 9467, 4: 422333}),
+    ("position 5", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+     {1: 44, 2: 1486, 3: 62379, 4: 2103487}),
+    ("position 6", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+     {1: 46, 2: 2079, 3: 89890, 4: 3894594}),
+]
+
+
+def perft(state: State, depth: int) -> int:
+    if depth == 0:
+        return 1
+
+    if depth == 1:
+        return count_legal_moves(state)  # Leaves are only counted, never built
+
+    nodes = 0
+    for move in legal_move_codes(state):
+        state.make(move)
+        nodes += perft(state, depth - 1)
+        state.unmake()
+    return nodes
+
+
+def divide(state: State, depth: int) -> dict[str, int]:
+    """
+    Node counts below each root move, the usual way to bisect a perft mismatch against another engine
+    """
+    counts = {}
+    for move in legal_move_codes(state):
+        state.make(move)
+        counts[move_to_uci(move)] = perft(state, depth - 1)
+        state.unmake()
+    return counts
+
+
+def run_suite(max_depth: int = 3) -> bool:
+    all_passed = True
+    total_nodes = 0
+    total_time = 0.0
+
+    for name, fen, expected_counts in PERFT_SUITE:
+        for depth, expected in sorted(expected_counts.items()):
+            if depth > max_depth:
+                break
+            state = State.from_fen(fen)
+
+            start = time.perf_counter()
+            nodes = perft(state, depth)
+            elapsed = time.perf_counter() - start
+
+            total_nodes += nodes
+            total_time += elapsed
+            passed = nodes == expected
+            all_passed &= passed
+            print(f"{'ok  ' if passed else 'FAIL'} {name:<11} depth {depth}: {nodes:>9} (expected {expected:>9})"
+                  f"  {elapsed:8.3f}s  {nodes / elapsed if elapsed else 0:>10.0f} nps")
+
+    print(f"\n{'All passed' if all_passed else 'MISMATCHES FOUND'}: {total_nodes} nodes in {total_time:.3f}s"
+          f" ({total_nodes / total_time if total_time else 0:.0f} nps)")
+    return all_passed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Perft move generation checker and benchmark")
+    parser.add_argument("depth", type=int, nargs="?", help="divide this position to the given depth instead of running the suite")
+    parser.add_argument("fen", nargs="*", help="position to divide (default: start position)")
+    parser.add_argument("--max-depth", type=int, default=3, help="deepest suite depth to run (default: 3)")
+    args = parser.parse_args()
+
+    if args.depth is None:
+        raise SystemExit(0 if run_suite(args.max_depth) else 1)
+
+    state = State.from_fen(" ".join(args.fen) if args.fen else START_FEN)
+    start = time.perf_counter()
+    counts = divide(state, args.depth)
+    elapsed = time.perf_counter() - start
+
+    for move_name, nodes in sorted(counts.items()):
+        print(f"{move_name}: {nodes}")
+    total = sum(counts.values())
+    print(f"\nMoves: {len(counts)}\nNodes: {total}\nTime: {elapsed:.3f}s ({total / elapsed if elapsed else 0:.0f} nps)")
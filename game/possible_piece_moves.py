@@ -1,267 +1,170 @@
 from bitboard import State
-from constants import PieceType, Square, Color ,RANK_1, RANK_2, RANK_7, RANK_8, FILE_A, FILE_H, KNIGHT_OFFSETS
-from move import Move
+from constants import PieceType, Square, Color, WHITE, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, NO_SQUARE, RANK_1, RANK_3, RANK_6, RANK_8, FILE_A, FILE_H, ALL_SQUARES
+from move import Move, encode_move, TO_SHIFT, PROMOTION_SHIFT, CAPTURE_FLAG, EN_PASSANT_FLAG
 from bit_ops import get_bit, clear_bit, lsb_index
+from attacks import bishop_attacks, rook_attacks, queen_attacks, KNIGHT_ATTACKS, PAWN_ATTACKS
 from utils import *
 
-def pawnMoves(state: State) -> list[Move]:
-    color: Color = state.toMove
+PROMOTION_PIECES = [QUEEN, ROOK, BISHOP, KNIGHT]
+
+def pawn_target_sets(pawns_bb: int, color: int, empty_bb: int, opponent_occupied_bb: int, targets: int) -> tuple[int, int, int, int]:
+    """
+    Whole-set pawn moves: single pushes, double pushes and the two capture directions,
+    each as a bitboard of landing squares.
+    """
+    if color == WHITE:
+        single_bb = (pawns_bb << 8) & empty_bb
+        double_bb = ((single_bb & RANK_3) << 8) & empty_bb & targets  # The single push only has to be empty
+        left_bb = ((pawns_bb & ~FILE_A) << 7) & opponent_occupied_bb & targets
+        right_bb = ((pawns_bb & ~FILE_H) << 9) & opponent_occupied_bb & targets
+    else:
+        single_bb = (pawns_bb >> 8) & empty_bb
+        double_bb = ((single_bb & RANK_6) >> 8) & empty_bb & targets
+        left_bb = ((pawns_bb & ~FILE_H) >> 7) & opponent_occupied_bb & targets
+        right_bb = ((pawns_bb & ~FILE_A) >> 9) & opponent_occupied_bb & targets
+    return single_bb & targets, double_bb, left_bb, right_bb
+
+
+def pawnMoves(state: State, targets: int = ALL_SQUARES, pins: dict[int, int] | None = None) -> list[int]:
+    """
+    Only moves landing on `targets` are produced (the check mask when in check), and a pinned pawn
+    is restricted to its entry in `pins` (pinned square -> allowed ray).
+    """
+    color = state.toMove
     moves = []
 
-    if color == Color.WHITE:
+    if color == WHITE:
         forward_one = 8
-        forward_two = 16
-        attack_left = 7
-        attack_right = 9
-        start_rank_bb = RANK_2
-        ep_capture_rank_bb = 0x00000000FF000000  # Rank 5
         promotion_rank_bb = RANK_8
+        left_delta = 7
     else:
         forward_one = -8
-        forward_two = -16
-        attack_left = -9
-        attack_right = -7
-        start_rank_bb = RANK_7
-        ep_capture_rank_bb = 0x000000FF00000000  # Rank 4
         promotion_rank_bb = RANK_1
+        left_delta = -7
 
-    current_pawns_bb = state.boards[color][PieceType.PAWN]
+    current_pawns_bb = state.boards[color][PAWN]
     opponent_occupied_bb = state.get_occupied_by_color(color ^ 1)
-    all_occupied_bb = state.get_all_occupied_squares()
-
-    temp_pawns_bb = current_pawns_bb
-    while temp_pawns_bb:
-        from_sq_idx = lsb_index(temp_pawns_bb)
-        from_sq = Square(from_sq_idx)
-        temp_pawns_bb = clear_bit(temp_pawns_bb, from_sq)
-
-        # --- 1. Single Forward Push ---
-        target_sq_push_one_idx = from_sq_idx + forward_one
-        if 0 <= target_sq_push_one_idx <= 63 and not get_bit(all_occupied_bb, target_sq_push_one_idx):
-            if (1 << target_sq_push_one_idx) & promotion_rank_bb:
-                for pt_promo in [PieceType.QUEEN, PieceType.ROOK, PieceType.BISHOP, PieceType.KNIGHT]:
-                    moves.append(Move(color, PieceType.PAWN, from_sq, Square(target_sq_push_one_idx), promotion_type=pt_promo, is_capture=False))
-            else:
-                moves.append(Move(color, PieceType.PAWN, from_sq, Square(target_sq_push_one_idx)))
-                # --- 2. Double Forward Push ---
-                if (1 << from_sq_idx) & start_rank_bb:
-                    target_sq_push_two_idx = from_sq_idx + forward_two
-                    if 0 <= target_sq_push_two_idx <= 63 and not get_bit(all_occupied_bb, target_sq_push_two_idx):
-                        moves.append(Move(color, PieceType.PAWN, from_sq, Square(target_sq_push_two_idx)))
-
-        # --- 3. Diagonal Captures ---
-        for offset in [attack_left, attack_right]:
-            target_sq_idx = from_sq_idx + offset
-            if 0 <= target_sq_idx <= 63:
-                same_rank = abs((from_sq_idx % 8) - (target_sq_idx % 8)) == 1
-                if same_rank and get_bit(opponent_occupied_bb, target_sq_idx):
-                    to_sq = Square(target_sq_idx)
-                    if (1 << target_sq_idx) & promotion_rank_bb:
-                        for pt_promo in [PieceType.QUEEN, PieceType.ROOK, PieceType.BISHOP, PieceType.KNIGHT]:
-                            moves.append(Move(color, PieceType.PAWN, from_sq, to_sq, is_capture=True, promotion_type=pt_promo))
-                    else:
-                        moves.append(Move(color, PieceType.PAWN, from_sq, to_sq, is_capture=True))
-
-        # --- 4. En Passant ---
-        if state.en_passant != Square.NO_SQUARE:
-            ep_target_idx = state.en_passant.value
-            if from_sq_idx // 8 == (4 if color == Color.WHITE else 3):
-                for offset in [attack_left, attack_right]:
-                    if from_sq_idx + offset == ep_target_idx:
-                        moves.append(Move(color, PieceType.PAWN, from_sq, Square(ep_target_idx), is_capture=True, is_en_passant=True))
+    empty_bb = ~state.get_all_occupied_squares() & ALL_SQUARES
+    base = encode_move(color, PAWN, 0, 0)
+
+    # Unpinned pawns move as one set, the rare pinned pawn as a set of one with its pin ray as the targets
+    pawn_sets = []
+    pinned_bb = 0
+    if pins:
+        for pinned_sq, ray in pins.items():
+            if (current_pawns_bb >> pinned_sq) & 1:
+                pinned_bb |= 1 << pinned_sq
+                pawn_sets.append((1 << pinned_sq, targets & ray))
+    pawn_sets.append((current_pawns_bb & ~pinned_bb, targets))
+
+    for pawns_bb, allowed_bb in pawn_sets:
+        single_bb, double_bb, left_bb, right_bb = pawn_target_sets(pawns_bb, color, empty_bb, opponent_occupied_bb, allowed_bb)
+
+        for targets_bb, delta, flags in ((single_bb, forward_one, 0), (double_bb, 2 * forward_one, 0),
+                                         (left_bb, left_delta, CAPTURE_FLAG), (right_bb, 2 * forward_one - left_delta, CAPTURE_FLAG)):
+            while targets_bb:
+                to_sq_idx = lsb_index(targets_bb)
+                targets_bb &= targets_bb - 1
+                move = base | (to_sq_idx - delta) | (to_sq_idx << TO_SHIFT) | flags
+                if (1 << to_sq_idx) & promotion_rank_bb:
+                    for pt_promo in PROMOTION_PIECES:
+                        moves.append(move | (pt_promo << PROMOTION_SHIFT))
+                else:
+                    moves.append(move)
+
+    # En passant: the pawns that could capture are the squares a pawn of the other color on the ep square attacks
+    if state.en_passant != NO_SQUARE:
+        ep_bb = 1 << state.en_passant
+        captured_bb = 1 << (state.en_passant - forward_one)
+        # Capturing the pawn that gives check is an evasion even though the landing square is not the checker's
+        if (ep_bb | captured_bb) & targets:
+            capturers_bb = PAWN_ATTACKS[color ^ 1][state.en_passant] & current_pawns_bb
+            while capturers_bb:
+                from_sq_idx = lsb_index(capturers_bb)
+                capturers_bb &= capturers_bb - 1
+                if not (pins and from_sq_idx in pins) or pins[from_sq_idx] & ep_bb:
+                    moves.append(base | from_sq_idx | (state.en_passant << TO_SHIFT) | CAPTURE_FLAG | EN_PASSANT_FLAG)
 
     return moves
 
 
-def knightMoves(state: State) -> list[Move]:
-    color: Color = state.toMove
+def knightMoves(state: State, targets: int = ALL_SQUARES, pins: dict[int, int] | None = None) -> list[int]:
+    color = state.toMove
     moves = []
 
-    knight_bb = state.boards[color][PieceType.KNIGHT]
+    knight_bb = state.boards[color][KNIGHT]
     own_occupied_bb = state.get_occupied_by_color(color) # Cant jump to square with player's piece on it
+    opponent_occupied_bb = state.get_occupied_by_color(color ^ 1)
 
     temp_knights_bb = knight_bb
     while temp_knights_bb:
         from_sq_idx = lsb_index(temp_knights_bb)
-        from_sq = Square(from_sq_idx)
-        temp_knights_bb = clear_bit(temp_knights_bb, from_sq)
-
-        from_rank = from_sq_idx // 8
-        from_file = from_sq_idx % 8
-
-        for offset in KNIGHT_OFFSETS:
-            target_sq_idx = from_sq_idx + offset
-
-            if not (0 <= target_sq_idx < 64):
-                continue  # Skip if off-board numerically
+        temp_knights_bb &= temp_knights_bb - 1
+        base = encode_move(color, KNIGHT, from_sq_idx, 0)
 
-            to_rank = target_sq_idx // 8
-            to_file = target_sq_idx % 8
+        if pins and from_sq_idx in pins:
+            continue  # A pinned knight can never stay on its pin ray
 
-            if abs(to_rank - from_rank) + abs(to_file - from_file) != 3:
-                continue  # Invalid wraparound or off-board move
+        targets_bb = KNIGHT_ATTACKS[from_sq_idx] & ~own_occupied_bb & targets
+        while targets_bb:
+            target_sq_idx = lsb_index(targets_bb)
+            targets_bb &= targets_bb - 1
 
-            if get_bit(own_occupied_bb, target_sq_idx):
-                continue  
-
-            moves.append(Move(color, PieceType.KNIGHT, from_sq, Square(target_sq_idx)))
+            flags = CAPTURE_FLAG if get_bit(opponent_occupied_bb, target_sq_idx) else 0
+            moves.append(base | (target_sq_idx << TO_SHIFT) | flags)
 
     return moves
 
-def bishopMoves(state: State) -> list[Move]:
-    """
-    Generates all legal bishop moves for the current player.
-    Bishops move diagonally until blocked.
-    """
-    color: Color = state.toMove
+def _slider_moves(state: State, piece_type: int, attack_func, targets: int, pins: dict[int, int] | None) -> list[int]:
+    color = state.toMove
     moves = []
 
-    bishop_bb = state.boards[color][PieceType.BISHOP]
     own_occupied_bb = state.get_occupied_by_color(color)
     opponent_occupied_bb = state.get_occupied_by_color(color ^ 1)
+    all_occupied_bb = own_occupied_bb | opponent_occupied_bb
 
-    directions = [+9, -9, +7, -7]  # NE, SW, NW, SE
-
-    temp_bishop_bb = bishop_bb
-    while temp_bishop_bb:
-        from_sq_idx = lsb_index(temp_bishop_bb)
-        from_sq = Square(from_sq_idx)
-        temp_bishop_bb = clear_bit(temp_bishop_bb, from_sq)
-
-        for direction in directions:
-            to_sq_idx = from_sq_idx
-            while True:
-                rank = to_sq_idx // 8
-                file = to_sq_idx % 8
-
-                to_sq_idx += direction
-                if not (0 <= to_sq_idx < 64):
-                    break
-
-                new_rank = to_sq_idx // 8
-                new_file = to_sq_idx % 8
-
-                # Prevent diagonal wrapping
-                if direction in [+9, -7] and new_file == 0 and file == 7:
-                    break
-                if direction in [-9, +7] and new_file == 7 and file == 0:
-                    break
-                if abs(new_file - file) > 2:
-                    break
+    temp_slider_bb = state.boards[color][piece_type]
+    while temp_slider_bb:
+        from_sq_idx = lsb_index(temp_slider_bb)
+        temp_slider_bb &= temp_slider_bb - 1
+        base = encode_move(color, piece_type, from_sq_idx, 0)
 
-                if get_bit(own_occupied_bb, to_sq_idx):
-                    break
+        # One table lookup gives every square up to and including the first blocker on each ray
+        targets_bb = attack_func(from_sq_idx, all_occupied_bb) & ~own_occupied_bb & targets
+        if pins and from_sq_idx in pins:
+            targets_bb &= pins[from_sq_idx]
+        while targets_bb:
+            to_sq_idx = lsb_index(targets_bb)
+            targets_bb &= targets_bb - 1
 
-                is_capture = get_bit(opponent_occupied_bb, to_sq_idx)
-                moves.append(Move(color, PieceType.BISHOP, from_sq, Square(to_sq_idx), is_capture=is_capture))
-
-                if is_capture:
-                    break
+            flags = CAPTURE_FLAG if get_bit(opponent_occupied_bb, to_sq_idx) else 0
+            moves.append(base | (to_sq_idx << TO_SHIFT) | flags)
 
     return moves
 
 
-def rookMoves(state: State) -> list[Move]:
-    color: Color = state.toMove
-    moves = []
-
-    rook_bb = state.boards[color][PieceType.ROOK]
-    own_occupied_bb = state.get_occupied_by_color(color)
-    opponent_occupied_bb = state.get_occupied_by_color(color ^ 1)
-
-    directions = [+8, -8, +1, -1]  # N, S, E, W
-
-    temp_rook_bb = rook_bb
-    while temp_rook_bb:
-        from_sq_idx = lsb_index(temp_rook_bb)
-        from_sq = Square(from_sq_idx)
-        temp_rook_bb = clear_bit(temp_rook_bb, from_sq)
-
-        for direction in directions:
-            to_sq_idx = from_sq_idx
-            while True:
-                rank = to_sq_idx // 8
-
-                to_sq_idx += direction
-
-                if not (0 <= to_sq_idx < 64):
-                    break
-
-                new_rank = to_sq_idx // 8
-
-                # Prevent horizontal wrap (e.g., a1 to a2 is valid, but a1 to b1 is only valid if still on same rank)
-                if direction == 1 and new_rank != rank: break  # East wrap
-                if direction == -1 and new_rank != rank: break  # West wrap
-
-                if get_bit(own_occupied_bb, to_sq_idx):
-                    break  # Blocked by own piece
-
-                is_capture = get_bit(opponent_occupied_bb, to_sq_idx)
-                moves.append(Move(color, PieceType.ROOK, from_sq, Square(to_sq_idx), is_capture=is_capture))
-
-                if is_capture:
-                    break  
-    return moves
-
-
-def queenMoves(state: State) -> list[Move]:
-
-    color: Color = state.toMove
-    moves = []
-
-    queen_bb = state.boards[color][PieceType.QUEEN]
-    own_occupied_bb = state.get_occupied_by_color(color)
-    opponent_occupied_bb = state.get_occupied_by_color(color ^ 1)
-
-    directions = [+8, -8, +1, -1, +9, -9, +7, -7]  # N, S, E, W, NE, SW, NW, SE
-
-    temp_queen_bb = queen_bb
-    while temp_queen_bb:
-        from_sq_idx = lsb_index(temp_queen_bb)
-        from_sq = Square(from_sq_idx)
-        temp_queen_bb = clear_bit(temp_queen_bb, from_sq)
-
-        for direction in directions:
-            to_sq_idx = from_sq_idx
-            while True:
-                rank = to_sq_idx // 8
-                file = to_sq_idx % 8
-
-                to_sq_idx += direction
-
-                # Check board bounds
-                if not (0 <= to_sq_idx < 64):
-                    break
-
-                new_rank = to_sq_idx // 8
-                new_file = to_sq_idx % 8
-
-                # Prevent horizontal wrapping for diagonal and rook directions
-                if direction in [+1, -1, +9, -7] and new_file == 0 and file == 7:
-                    break  # wrapped from H-file to A-file
-                if direction in [-1, +7, -9] and new_file == 7 and file == 0:
-                    break  # wrapped from A-file to H-file
-                if abs(new_file - file) > 2:  # in case of multi-wrapping
-                    break
+def bishopMoves(state: State, targets: int = ALL_SQUARES, pins: dict[int, int] | None = None) -> list[int]:
+    """
+    Generates all legal bishop moves for the current player.
+    Bishops move diagonally until blocked.
+    """
+    return _slider_moves(state, BISHOP, bishop_attacks, targets, pins)
 
-                if get_bit(own_occupied_bb, to_sq_idx):
-                    break  # Blocked by own piece
 
-                is_capture = get_bit(opponent_occupied_bb, to_sq_idx)
-                moves.append(Move(color, PieceType.QUEEN, from_sq, Square(to_sq_idx), is_capture=is_capture))
+def rookMoves(state: State, targets: int = ALL_SQUARES, pins: dict[int, int] | None = None) -> list[int]:
+    return _slider_moves(state, ROOK, rook_attacks, targets, pins)
 
-                if is_capture:
-                    break  # Stop after capture
 
-    return moves
+def queenMoves(state: State, targets: int = ALL_SQUARES, pins: dict[int, int] | None = None) -> list[int]:
+    return _slider_moves(state, QUEEN, queen_attacks, targets, pins)
 
 
 
 if __name__ == '__main__':
     state = State()
 
-    print(pawnMoves(state))
-    print(knightMoves(state))
-    print(bishopMoves(state))
-    print(rookMoves(state))
-    print(queenMoves(state))
\ No newline at end of file
+    print([Move.from_code(move).notation() for move in pawnMoves(state)])
+    print([Move.from_code(move).notation() for move in knightMoves(state)])
+    print([Move.from_code(move).notation() for move in bishopMoves(state)])
+    print([Move.from_code(move).notation() for move in rookMoves(state)])
+    print([Move.from_code(move).notation() for move in queenMoves(state)])
\ No newline at end of file
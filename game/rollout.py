@@ -0,0 +1,83 @@
+"""
+Random playouts for Monte Carlo search.
+
+Unlike main.game(), a playout works on packed move codes only (no Move objects, check annotation or
+SEE filtering) and unmakes every move at the end, so the caller's State is left as it was.
+Repetitions are tracked by Zobrist key since the last irreversible move, and material is only
+re-examined after a capture or promotion.
+"""
+import random
+
+from bitboard import State
+from constants import BLACK
+from move import move_promotion, CAPTURE_FLAG
+from legal_moves import legal_move_codes
+from legal_king_moves import is_in_check
+from game_over import is_insufficient_material
+
+
+def playout(state: State, rng: random.Random = random, max_plies: int | None = None) -> tuple[float, int]:
+    """
+    Plays uniformly random legal moves to the end of the game and returns (result, plies played):
+    1 white wins, -1 black wins, 0.5 draw. Reaching max_plies counts as a draw.
+    """
+    if state.occupied.bit_count() < 5 and is_insufficient_material(state):
+        return 0.5, 0
+
+    seen_keys = {state.key: 1}
+    result = 0.5
+    plies = 0
+
+    while max_plies is None or plies < max_plies:
+        moves = legal_move_codes(state)
+        if not moves:
+            if is_in_check(state):
+                result = 1 if state.toMove == BLACK else -1
+            break
+
+        move = moves[rng.randrange(len(moves))]
+        state.make(move)
+        plies += 1
+
+        if state.fifty_move == 0:
+            # Pawn move or capture: no earlier position can repeat, and only now can material run out
+            seen_keys.clear()
+            if move & CAPTURE_FLAG or move_promotion(move):
+                if state.occupied.bit_count() < 5 and is_insufficient_material(state):
+                    break
+        elif state.fifty_move >= 100:
+            break
+
+        repetitions = seen_keys.get(state.key, 0) + 1
+        if repetitions == 3:
+            break
+        seen_keys[state.key] = repetitions
+
+    for _ in range(plies):
+        state.unmake()
+    return result, plies
+
+
+def rollout(state: State, games: int, rng: random.Random = random, max_plies: int | None = None) -> tuple[int, int, int, int]:
+    """
+    Plays games random playouts from the position, returns (white wins, draws, black wins, total plies).
+    """
+    outcomes = {1: 0, 0.5: 0, -1: 0}
+    total_plies = 0
+    for _ in range(games):
+        result, plies = playout(state, rng, max_plies)
+        outcomes[result] += 1
+        total_plies += plies
+    return outcomes[1], outcomes[0.5], outcomes[-1], total_plies
+
+
+if __name__ == '__main__':
+    import time
+
+    state = State()
+    start = time.perf_counter()
+    white, draws, black, plies = rollout(state, 50, random.Random(0))
+    elapsed = time.perf_counter() - start
+
+    print(f"White {white}  Draw {draws}  Black {black}")
+    print(f"{50 / elapsed:.1f} playouts/s, {plies / elapsed:.0f} plies/s")
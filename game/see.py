@@ -0,0 +1,75 @@
+"""
+Static exchange evaluation: the material outcome of a capture sequence on one square, with each side
+recapturing with its least valuable attacker and free to stop when continuing would lose material.
+Nothing is played on the board; pieces are taken off a local occupancy so x-ray attackers appear.
+"""
+from bitboard import State
+from constants import PAWN, KING, WHITE, PIECE_VALUES
+from move import move_from, move_to, move_piece_type, move_promotion, move_color, CASTLE_FLAG, EN_PASSANT_FLAG
+from utils import attackers_to_square
+
+
+def see(state: State, move: int) -> int:
+    """
+    Material balance in centipawns of the full exchange started by move, from the mover's point of view.
+    Quiet moves score what the opponent wins by capturing the moved piece, if anything; castling scores 0.
+    """
+    if move & CASTLE_FLAG:
+        return 0
+
+    from_sq = move_from(move)
+    to_sq = move_to(move)
+    side = move_color(move)
+    occupancy = state.get_all_occupied_squares() & ~(1 << from_sq)
+
+    if move & EN_PASSANT_FLAG:
+        captured_sq = to_sq - 8 if side == WHITE else to_sq + 8
+        occupancy &= ~(1 << captured_sq)
+        gains = [PIECE_VALUES[PAWN]]
+    else:
+        victim = state.mailbox[to_sq]
+        gains = [PIECE_VALUES[victim[1]] if victim else 0]
+
+    # Value of the piece now standing on to_sq, the next thing to be captured
+    on_square_value = PIECE_VALUES[move_piece_type(move)]
+    promotion = move_promotion(move)
+    if promotion != PAWN:
+        gains[0] += PIECE_VALUES[promotion] - PIECE_VALUES[PAWN]
+        on_square_value = PIECE_VALUES[promotion]
+
+    attackers = attackers_to_square(state, to_sq, occupancy)
+    side ^= 1
+    while True:
+        side_attackers = attackers & state.get_occupied_by_color(side)
+        if not side_attackers:
+            break
+
+        # Least valuable attacker recaptures
+        for piece_type in range(6):
+            piece_attackers = side_attackers & state.boards[side][piece_type]
+            if piece_attackers:
+                break
+
+        if piece_type == KING and attackers & state.get_occupied_by_color(side ^ 1):
+            break  # The king cannot capture into a defended square
+
+        gains.append(on_square_value - gains[-1])
+
+        on_square_value = PIECE_VALUES[piece_type]
+        occupancy &= ~(piece_attackers & -piece_attackers)
+        attackers = attackers_to_square(state, to_sq, occupancy)  # Sliders behind the recapturer join in
+        side ^= 1
+
+    # Each side may stand pat instead of recapturing
+    for depth in range(len(gains) - 1, 0, -1):
+        gains[depth - 1] = -max(-gains[depth - 1], gains[depth])
+    return gains[0]
+
+
+if __name__ == '__main__':
+    from move import move_to_uci
+    from legal_moves import capture_move_codes
+
+    state = State.from_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+    for move in capture_move_codes(state):
+        print(move_to_uci(move), see(state, move))
@@ -0,0 +1,74 @@
+"""
+Self-play runner: spreads random games over a process pool and streams them back as they finish.
+
+A task is only a FEN, a seed and a range of game indices. Workers build their own State for every
+game, so no board is ever pickled, and results come back as plain tuples of ints and strings.
+
+    python selfplay.py 1000                   # 1000 games on every core
+    python selfplay.py 1000 --workers 4 --seed 7 --out games.txt
+"""
+import argparse
+import multiprocessing
+import random
+import time
+
+from bitboard import State
+from constants import START_FEN
+from main import game
+from move import move_to_uci
+
+
+def play_games(task: tuple[str, int, int, int]) -> list[tuple[int, float, list[str]]]:
+    """
+    Worker entry point: plays games first .. first + count - 1 from the FEN.
+    Every game has its own RNG seeded from (seed, index), so it replays identically however the games were split up.
+    """
+    fen, seed, first, count = task
+    results = []
+    for index in range(first, first + count):
+        moves = []
+        result = game(State.from_fen(fen), random.Random(f"{seed}:{index}"), moves)
+        results.append((index, result, [move_to_uci(move.to_code()) for move in moves]))
+    return results
+
+
+def self_play(n_games: int, workers: int | None = None, seed: int = 0, fen: str = START_FEN, batch_size: int = 4):
+    """
+    Yields (game index, result, UCI moves) for n_games random games in the order they finish.
+    Small batches keep the stream steady; closing the generator early stops the pool.
+    """
+    tasks = [(fen, seed, first, min(batch_size, n_games - first)) for first in range(0, n_games, batch_size)]
+    with multiprocessing.Pool(workers) as pool:
+        for results in pool.imap_unordered(play_games, tasks):
+            yield from results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Parallel random self-play")
+    parser.add_argument("games", type=int, help="number of games to play")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--seed", type=int, default=0, help="base seed, games are reproducible per (seed, index)")
+    parser.add_argument("--batch-size", type=int, default=4, help="games per task sent to a worker")
+    parser.add_argument("--fen", default=START_FEN, help="starting position (default: start position)")
+    parser.add_argument("--out", help="append one line per finished game: index, result, moves")
+    args = parser.parse_args()
+
+    outcomes = {1: 0, 0.5: 0, -1: 0}
+    plies = 0
+    out = open(args.out, "a") if args.out else None
+
+    start = time.perf_counter()
+    for done, (index, result, moves) in enumerate(self_play(args.games, args.workers, args.seed, args.fen, args.batch_size), 1):
+        outcomes[result] += 1
+        plies += len(moves)
+        if out:
+            out.write(f"{index} {result} {' '.join(moves)}\n")
+        if done % 100 == 0 or done == args.games:
+            elapsed = time.perf_counter() - start
+            print(f"{done:>7} games  {done / elapsed:8.1f} games/s  {plies / elapsed:10.0f} plies/s")
+    elapsed = time.perf_counter() - start
+
+    if out:
+        out.close()
+    print(f"\nWhite {outcomes[1]}  Draw {outcomes[0.5]}  Black {outcomes[-1]}  in {elapsed:.2f}s"
+          f" ({args.games / elapsed:.1f} games/s, {plies / elapsed:.0f} plies/s)")
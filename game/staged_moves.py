@@ -0,0 +1,88 @@
+"""
+Staged move generation for search: each stage is only generated once the caller has consumed the
+previous one, so a cutoff on the hash move or an early capture skips generating the quiet moves.
+
+    for move in staged_moves(state, hash_move):
+        state.make(move)
+        ...
+        state.unmake()   # The position must be restored before asking for the next move
+"""
+from bitboard import State
+from constants import WHITE, PAWN, RANK_1, RANK_8
+from move import move_to, move_piece_type, move_promotion, CAPTURE_FLAG, EN_PASSANT_FLAG
+from legal_king_moves import kingMoves
+from possible_piece_moves import pawnMoves
+from legal_moves import check_and_pin_masks, piece_move_codes, is_legal
+from see import see
+
+
+def mvv_lva_key(state: State, move: int) -> int:
+    """
+    Most valuable victim first, least valuable attacker among equal victims; sorts ascending.
+    """
+    if move & EN_PASSANT_FLAG:
+        victim = PAWN
+    else:
+        victim = state.mailbox[move_to(move)][1]
+    return -(victim * 8 + move_promotion(move) - move_piece_type(move))
+
+
+def staged_moves(state: State, hash_move: int = 0):
+    """
+    Yields the legal moves of the side to move: the hash move (if legal), captures that do not lose
+    material ordered by victim/attacker, quiet promotions, the remaining quiet moves, and finally
+    the captures that lose the exchange, best first.
+    """
+    if hash_move and is_legal(state, hash_move):
+        yield hash_move
+
+    king_loc, attackers_count, valid_targets, pins = check_and_pin_masks(state)
+    color = state.toMove
+    empty_bb = ~state.get_all_occupied_squares()
+    promotion_rank_bb = RANK_8 if color == WHITE else RANK_1
+
+    # Captures: the opponent's pieces are the targets, plus the en passant square for the pawn captures
+    opponent_occupied_bb = state.get_occupied_by_color(color ^ 1)
+    captures = kingMoves(state, attackers_count, opponent_occupied_bb)
+    if attackers_count < 2:
+        capture_targets = valid_targets & (opponent_occupied_bb | (1 << state.en_passant))
+        captures.extend(move for move in piece_move_codes(state, capture_targets, king_loc, pins) if move & CAPTURE_FLAG)
+
+    # Captures that lose the exchange are held back until after the quiet moves
+    bad_captures = []
+    good_captures = []
+    for move in captures:
+        if move == hash_move:
+            continue
+        exchange = see(state, move)
+        if exchange < 0:
+            bad_captures.append((exchange, move))
+        else:
+            good_captures.append(move)
+    good_captures.sort(key=lambda move: mvv_lva_key(state, move))
+    yield from good_captures
+
+    if attackers_count < 2:
+        # Promotions without a capture, queen first as generated
+        for move in pawnMoves(state, valid_targets & empty_bb & promotion_rank_bb, pins):
+            if move != hash_move:
+                yield move
+
+    for move in kingMoves(state, attackers_count, empty_bb):
+        if move != hash_move:
+            yield move
+    if attackers_count < 2:
+        for move in piece_move_codes(state, valid_targets & empty_bb, king_loc, pins):
+            if move != hash_move and not move & EN_PASSANT_FLAG and move_promotion(move) == PAWN:
+                yield move
+
+    bad_captures.sort(reverse=True)
+    for exchange, move in bad_captures:
+        yield move
+
+
+if __name__ == '__main__':
+    from move import move_to_uci
+
+    state = State.from_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+    print([move_to_uci(move) for move in staged_moves(state)])
@@ -1,184 +1,78 @@
 from bitboard import State
 from constants import *
 from bit_ops import *
-from possible_piece_moves import knightMoves, bishopMoves, rookMoves, queenMoves
-
-def is_square_attacked(state: State, target_sq: Square) -> bool:
-
-    def knight_attack_indices(square: int) -> list[int]:
-        rank, file = divmod(square, 8)
-        deltas = [(-2, -1), (-2, +1), (-1, -2), (-1, +2),
-                (+1, -2), (+1, +2), (+2, -1), (+2, +1)]
-        attacks = []
-        for dr, df in deltas:
-            r, f = rank + dr, file + df
-            if 0 <= r < 8 and 0 <= f < 8:
-                attacks.append(r * 8 + f)
-        return attacks
-
-    def king_attack_indices(square: int) -> list[int]:
-        rank, file = divmod(square, 8)
-        deltas = [(-1, -1), (-1, 0), (-1, +1),
-                (0, -1),          (0, +1),
-                (+1, -1), (+1, 0), (+1, +1)]
-        attacks = []
-        for dr, df in deltas:
-            r, f = rank + dr, file + df
-            if 0 <= r < 8 and 0 <= f < 8:
-                attacks.append(r * 8 + f)
-        return attacks
-    def bishop_attacks(square: int, occupancy: int) -> int:
-        return sliding_attacks(square, occupancy, [(-1, -1), (-1, +1), (+1, -1), (+1, +1)])
-
-    def rook_attacks(square: int, occupancy: int) -> int:
-        return sliding_attacks(square, occupancy, [(-1, 0), (+1, 0), (0, -1), (0, +1)])
-
-    def sliding_attacks(square: int, occupancy: int, directions: list[tuple[int, int]]) -> int:
-        # Generalized sliding attack generator
-        attacks = 0
-        rank, file = divmod(square, 8)
-
-        for dr, df in directions:
-            r, f = rank + dr, file + df
-            while 0 <= r < 8 and 0 <= f < 8:
-                idx = r * 8 + f
-                attacks |= (1 << idx)
-                if occupancy & (1 << idx):  # Blocked
-                    break
-                r += dr
-                f += df
-
-        return attacks
+from attacks import bishop_attacks, rook_attacks, KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, BETWEEN, LINE
 
+def is_square_attacked(state: State, target_sq: int) -> bool:
+    """
+    Whether the side not to move attacks target_sq. For repeated questions about the same position,
+    state.attacked_by() answers each with one AND.
+    """
 
     by_color = state.toMove ^ 1
     target_idx = target_sq
 
-    # 1. Pawn attacks
-    pawn_bb = state.boards[by_color][PieceType.PAWN]
-    if by_color == Color.WHITE:
-        left_attack = (1 << target_idx) >> 9 & ~FILE_H
-        right_attack = (1 << target_idx) >> 7 & ~FILE_A
-    else:
-        left_attack = (1 << target_idx) << 7 & ~FILE_H
-        right_attack = (1 << target_idx) << 9 & ~FILE_A
-    if pawn_bb & (left_attack | right_attack):
+    # 1. Pawn attacks (a pawn attacks the target iff a pawn of the other color on the target attacks it back)
+    if PAWN_ATTACKS[by_color ^ 1][target_idx] & state.boards[by_color][PAWN]:
         return True
 
     # 2. Knight attacks
-    for knight_sq in bitscan(state.boards[by_color][PieceType.KNIGHT]):
-        if target_idx in knight_attack_indices(knight_sq):
-            return True
+    if KNIGHT_ATTACKS[target_idx] & state.boards[by_color][KNIGHT]:
+        return True
 
     # 3. King attacks
-    for king_sq in bitscan(state.boards[by_color][PieceType.KING]):
-        if target_idx in king_attack_indices(king_sq):
-            return True
+    if KING_ATTACKS[target_idx] & state.boards[by_color][KING]:
+        return True
 
-    # 4. Sliding attacks (bishop, rook, queen)
+    # 4. Sliding attacks (bishop, rook, queen), looked up from the target square outwards
     occupancy = state.get_all_occupied_squares()
-    for piece_type, attack_func in [
-        (PieceType.BISHOP, bishop_attacks),
-        (PieceType.ROOK, rook_attacks),
-        (PieceType.QUEEN, lambda sq, occ: bishop_attacks(sq, occ) | rook_attacks(sq, occ))
-    ]:
-        attacker_bb = state.boards[by_color][piece_type]
-        for from_sq in bitscan(attacker_bb):
-            if (1 << target_idx) & attack_func(from_sq, occupancy):
-                return True
+    queen_bb = state.boards[by_color][QUEEN]
+    if bishop_attacks(target_idx, occupancy) & (state.boards[by_color][BISHOP] | queen_bb):
+        return True
+    if rook_attacks(target_idx, occupancy) & (state.boards[by_color][ROOK] | queen_bb):
+        return True
 
     return False
 
 
-def attackers_to_square(state: State, target_sq: Square) -> int:
-    by_color = state.toMove ^ 1
-    attackers = 0
-
-    # Check pawn attacks
-    pawn_bb = state.boards[by_color][PieceType.PAWN]
-    if by_color == Color.WHITE:
-        if target_sq >= 9 and target_sq % 8 != 0:
-            bit = (1 << (target_sq - 9)) & pawn_bb
-            attackers |= bit
-        if target_sq >= 7 and target_sq % 8 != 7:
-            bit = (1 << (target_sq - 7)) & pawn_bb
-            attackers |= bit
-    else:
-        if target_sq <= 55 and target_sq % 8 != 0:
-            bit = (1 << (target_sq + 7)) & pawn_bb
-            attackers |= bit
-        if target_sq <= 54 and target_sq % 8 != 7:
-            bit = (1 << (target_sq + 9)) & pawn_bb
-            attackers |= bit
-
-    saved_turn = state.toMove
-    state.toMove = by_color
-
-    # Check knights
-    for move in knightMoves(state):
-        if move.to_sq == target_sq:
-            attackers |= (1 << move.from_sq)
-
-    # Check bishops
-    for move in bishopMoves(state):
-        if move.to_sq == target_sq:
-            attackers |= (1 << move.from_sq)
-
-    # Check rooks
-    for move in rookMoves(state):
-        if move.to_sq == target_sq:
-            attackers |= (1 << move.from_sq)
-
-    # Check queens
-    for move in queenMoves(state):
-        if move.to_sq == target_sq:
-            attackers |= (1 << move.from_sq)
+def attackers_to_square(state: State, target_sq: int, occupancy: int | None = None, color: int | None = None) -> int:
+    """
+    Bitboard of every piece attacking target_sq, of one color or (color=None) both.
+    Pass an occupancy to see through pieces that have been taken off, e.g. for x-rays in exchanges.
+    Only reads the state.
+    """
+    if occupancy is None:
+        occupancy = state.get_all_occupied_squares()
+    white, black = state.boards
 
-    state.toMove = saved_turn
+    bishop_rays = bishop_attacks(target_sq, occupancy)
+    rook_rays = rook_attacks(target_sq, occupancy)
 
-    return attackers
+    # Each lookup is done from the target outwards: a piece attacks the target iff the same piece on the target attacks it back
+    attackers = 0
+    if color != BLACK:
+        attackers |= PAWN_ATTACKS[BLACK][target_sq] & white[PAWN]
+        attackers |= KNIGHT_ATTACKS[target_sq] & white[KNIGHT]
+        attackers |= KING_ATTACKS[target_sq] & white[KING]
+        attackers |= bishop_rays & (white[BISHOP] | white[QUEEN])
+        attackers |= rook_rays & (white[ROOK] | white[QUEEN])
+    if color != WHITE:
+        attackers |= PAWN_ATTACKS[WHITE][target_sq] & black[PAWN]
+        attackers |= KNIGHT_ATTACKS[target_sq] & black[KNIGHT]
+        attackers |= KING_ATTACKS[target_sq] & black[KING]
+        attackers |= bishop_rays & (black[BISHOP] | black[QUEEN])
+        attackers |= rook_rays & (black[ROOK] | black[QUEEN])
+
+    # Pieces already taken off the board in an exchange must not attack from their old squares
+    return attackers & occupancy
 
 
 def squares_between(from_sq: int, to_sq: int) -> int:
     """
-    Generates a bitboard of all squares strictly between from_sq and to_sq.
-    Does NOT include from_sq or to_sq.
-    Only supports aligned squares: same rank, file, or diagonal.
+    Bitboard of all squares strictly between from_sq and to_sq, 0 unless they share a rank, file or diagonal.
     """
-    from_rank, from_file = divmod(from_sq, 8)
-    to_rank, to_file = divmod(to_sq, 8)
-
-    dr = to_rank - from_rank
-    df = to_file - from_file
-
-    # Check alignment: must be same rank, file, or diagonal
-    if dr != 0 and df != 0 and abs(dr) != abs(df):
-        return 0  # Not aligned, so no squares between
-
-    if dr != 0: dr //= abs(dr)
-    if df != 0: df //= abs(df)
-
-    direction = dr * 8 + df
-
-    bb = 0
-    current_sq = from_sq + direction
-    while current_sq != to_sq:
-        if not (0 <= current_sq < 64):
-            break  # Prevent overflow or infinite loop
-        bb |= 1 << current_sq
-        current_sq += direction
-
-    return bb
+    return BETWEEN[from_sq][to_sq]
 
 def is_along_ray(origin: int, from_sq: int, to_sq: int) -> bool:
-    # True if origin, from_sq, and to_sq lie in a straight line
-    dr1, df1 = divmod(from_sq, 8)
-    dr0, df0 = divmod(origin, 8)
-    dr2, df2 = divmod(to_sq, 8)
-
-    # Check if slopes are equal (avoiding div by 0)
-    vec1 = (dr1 - dr0, df1 - df0)
-    vec2 = (dr2 - dr1, df2 - df1)
-
-    return vec1[0] * vec2[1] == vec1[1] * vec2[0]  # cross product == 0
-
+    # True if to_sq lies on the line through origin and from_sq
+    return bool(LINE[origin][from_sq] & (1 << to_sq))
@@ -0,0 +1,13 @@
+"""
+Zobrist keys for incremental 64-bit position hashing.
+
+The generator is seeded with a constant, so keys are identical across runs and worker processes.
+"""
+import random
+
+_rng = random.Random(0x5EED)
+
+ZOBRIST_PIECES = [[[_rng.getrandbits(64) for _ in range(64)] for _ in range(6)] for _ in range(2)] # [color][piece][square]
+ZOBRIST_SIDE = _rng.getrandbits(64) # XORed in when black is to move
+ZOBRIST_CASTLING = [_rng.getrandbits(64) for _ in range(16)] # One key per castling-rights nibble
+ZOBRIST_EP_FILE = [_rng.getrandbits(64) for _ in range(8)]